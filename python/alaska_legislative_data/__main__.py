@@ -1,12 +1,29 @@
+import importlib
 import logging
+import sys
+from collections.abc import Callable, Iterable
 
 import dotenv
 import fire
 
-from alaska_legislative_data import _export, _ingest
-
 logger = logging.getLogger(__name__)
 
+COMMANDS = {
+    "ingest": ("alaska_legislative_data._ingest", "ingest_all"),
+    "export": ("alaska_legislative_data._export", "export"),
+}
+"""The CLI commands, as (module, function) to import when that command is run.
+
+So eg `export` doesn't import httpx and all of the scraping code.
+"""
+
+
+def _load_commands(names: Iterable[str]) -> dict[str, Callable]:
+    return {
+        name: getattr(importlib.import_module(COMMANDS[name][0]), COMMANDS[name][1])
+        for name in names
+    }
+
 
 def main():
     dotenv.load_dotenv(dotenv.find_dotenv(".env"))
@@ -14,16 +31,14 @@ def main():
         level=logging.INFO,
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     )
+    # Only import the command being run. For eg --help, import them all.
+    requested = [arg for arg in sys.argv[1:2] if arg in COMMANDS]
+    commands = _load_commands(requested or COMMANDS)
     # Set log level for other libraries to a higher level to suppress their logs
     for logger_name in logging.root.manager.loggerDict:
         if not logger_name.startswith("alaska_legislative_data"):
             logging.getLogger(logger_name).setLevel(logging.WARNING)
-    fire.Fire(
-        {
-            "ingest": _ingest.ingest_all,
-            "export": _export.export,
-        }
-    )
+    fire.Fire(commands)
 
 
 if __name__ == "__main__":
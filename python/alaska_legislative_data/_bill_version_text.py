@@ -3,10 +3,13 @@ import re
 
 import httpx
 
-from alaska_legislative_data import _low
+from alaska_legislative_data import _http
 
 logger = logging.getLogger(__name__)
 
+READ_TIMEOUT = 30.0
+"""httpx's read timeout for a download: how long to wait for each chunk of it."""
+
 
 # https://www.akleg.gov/basis/Bill/Plaintext/25?Hsid=HB0087A
 async def get_bill_version_text(
@@ -40,21 +43,14 @@ def format_bill_number(bill_number_raw: str) -> str:
 
 
 async def _fetch_safe(url: str) -> str:
-    i = 0
-    while True:
-        i += 1
-        exception = None
-        try:
-            return await _fetch(url)
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                raise
-            exception = e
-        except Exception as e:
-            exception = e
-        logger.warning("Error fetching %s: %s", url, exception)
-        if i > 5:
-            raise
+    return await _http.with_retries(
+        lambda: _fetch(url),
+        max_retries=6,
+        # A 404 means that version doesn't exist, retrying won't help.
+        give_up=lambda e: (
+            isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 404
+        ),
+    )
 
 
 async def _fetch(url: str) -> str:
@@ -65,13 +61,12 @@ async def _fetch(url: str) -> str:
         "X-Alaska-Legislature-Basis-Version": "1.4",
         "user-agent": "Mozilla/5.0",
     }
-    async with httpx.AsyncClient(headers=headers) as client:
-        async with _low.rate_semaphore:
-            # some versions, like https://www.akleg.gov/basis/Bill/Plaintext/27?Hsid=SB0160C,
-            # are huge and take a long time to download
-            response = await client.get(url, timeout=60)
-            response.raise_for_status()
-            return response.text
+    # some versions, like https://www.akleg.gov/basis/Bill/Plaintext/27?Hsid=SB0160C,
+    # are huge and take a long time to download.
+    # httpx has no limit on the whole download, only this read timeout,
+    # which applies to each read from the connection.
+    timeout = httpx.Timeout(30.0, read=READ_TIMEOUT)
+    return await _http.fetch_text(url, headers=headers, timeout=timeout)
 
 
 def _parse_raw_text(raw_text: str) -> str:
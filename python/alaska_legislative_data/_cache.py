@@ -0,0 +1,337 @@
+"""An on-disk cache of responses from akleg.gov.
+
+Set the `AK_LEG_CACHE_DIR` environment variable to turn it on.
+Then, re-running a failed ingest, or iterating in a notebook,
+doesn't need to re-download everything from the (slow) BASIS API.
+
+The layout of the cache directory is:
+
+    entries/ab/abcdef....json  # one per (url, query headers), with metadata
+    bodies/12/123456....gz     # response bodies, named by the sha256 of their content
+
+Since bodies are content-addressed, identical responses
+(eg the same bill plaintext requested two different ways) are only stored once.
+Bodies are compressed with zstd if `zstandard` is installed, otherwise gzip.
+
+An entry's mtime is when it was last used, so `ResponseCache.prune()`
+can drop the ones we don't need any more, and the bodies only they used.
+Set `AK_LEG_CACHE_MAX_BYTES` to also cap the size of the bodies.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+import httpx
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+_HOUR = 60 * 60
+_DAY = 24 * _HOUR
+
+DEFAULT_TTLS: dict[str, float] = {
+    "bills": 12 * _HOUR,
+    "committees": 12 * _HOUR,
+    "meetings": 12 * _HOUR,
+    "members": 12 * _HOUR,
+    "sessions": 7 * _DAY,
+    # The text of a version of a bill never changes once it's published.
+    "Plaintext": 365 * _DAY,
+}
+"""How many seconds a response from each endpoint is considered fresh."""
+
+KEY_HEADERS = ("X-Alaska-Legislature-Basis-Query", "X-Alaska-Query-ResultRange")
+"""Headers that change the content of the response, so are part of the cache key."""
+
+
+@dataclasses.dataclass
+class CacheEntry:
+    url: str
+    key: str
+    body_hash: str
+    fetched_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+    encoding: str | None = None
+    """The charset of the body, eg "utf-8". None in entries from before we kept it."""
+
+    def validators(self) -> dict[str, str]:
+        """Headers for asking the server whether our copy is still current."""
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """A content-addressed, on-disk cache of response bodies.
+
+    Parameters
+    ----------
+    directory:
+        Where to store the cache. Created if it doesn't exist.
+    ttls:
+        Overrides for `DEFAULT_TTLS`, keyed by endpoint name.
+    default_ttl:
+        The TTL in seconds for endpoints not in `ttls`.
+    max_unused:
+        `prune()` removes entries that haven't been used for this many seconds.
+    max_bytes:
+        `prune()` removes the least recently used entries
+        until the bodies take up at most this many bytes. None for no limit.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        ttls: dict[str, float] | None = None,
+        default_ttl: float = 12 * _HOUR,
+        max_unused: float = 30 * _DAY,
+        max_bytes: int | None = None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.max_unused = max_unused
+        self.max_bytes = max_bytes
+        self.n_hits = 0
+        self.n_misses = 0
+        self.n_revalidated = 0
+
+    @classmethod
+    def from_env(cls) -> ResponseCache | None:
+        """The cache in `$AK_LEG_CACHE_DIR`, or None if that isn't set.
+
+        Its size is capped at `$AK_LEG_CACHE_MAX_BYTES`, if that's set.
+        """
+        directory = os.environ.get("AK_LEG_CACHE_DIR")
+        if not directory:
+            return None
+        max_bytes = os.environ.get("AK_LEG_CACHE_MAX_BYTES")
+        return cls(directory, max_bytes=int(max_bytes) if max_bytes else None)
+
+    def __repr__(self) -> str:
+        return (
+            f"ResponseCache({str(self.directory)!r}, hits={self.n_hits}, "
+            f"misses={self.n_misses}, revalidated={self.n_revalidated})"
+        )
+
+    def lookup(
+        self, url: str, headers: dict[str, str], *, ttl: float | None = None
+    ) -> CacheEntry | None:
+        """Find the (possibly stale) entry for this request, if we have one.
+
+        `ttl` is as for `is_fresh()`, and only affects the hit/miss counts.
+        """
+        key = _key(url, headers)
+        path = self._entry_path(key)
+        try:
+            entry = CacheEntry(**json.loads(path.read_text()))
+        except (FileNotFoundError, json.JSONDecodeError, TypeError):
+            self.n_misses += 1
+            return None
+        if not self._body_path(entry.body_hash).exists():
+            self.n_misses += 1
+            return None
+        if self.is_fresh(entry, ttl=ttl):
+            self.n_hits += 1
+        else:
+            self.n_misses += 1
+        # Mark it as used, for prune().
+        os.utime(path)
+        return entry
+
+    def read(self, entry: CacheEntry) -> bytes:
+        """Read the body of an entry."""
+        path = self._body_path(entry.body_hash)
+        raw = path.read_bytes()
+        if path.suffix == ".zst":
+            raw = zstandard.ZstdDecompressor().decompress(raw)
+        else:
+            raw = gzip.decompress(raw)
+        return raw
+
+    def store(
+        self, url: str, headers: dict[str, str], response: httpx.Response
+    ) -> CacheEntry:
+        """Store a successful response."""
+        body = response.content
+        body_hash = hashlib.sha256(body).hexdigest()
+        body_path = self._body_path(body_hash)
+        if not body_path.exists():
+            if body_path.suffix == ".zst":
+                compressed = zstandard.ZstdCompressor(level=10).compress(body)
+            else:
+                compressed = gzip.compress(body, compresslevel=6)
+            _atomic_write(body_path, compressed)
+        entry = CacheEntry(
+            url=url,
+            key=_key(url, headers),
+            body_hash=body_hash,
+            fetched_at=time.time(),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            encoding=response.encoding,
+        )
+        self._write_entry(entry)
+        return entry
+
+    def is_fresh(self, entry: CacheEntry, *, ttl: float | None = None) -> bool:
+        """Whether an entry is young enough to use without asking the server.
+
+        `ttl` overrides the TTL of the entry's endpoint, eg 0 to always ask.
+        """
+        if ttl is None:
+            ttl = self.ttls.get(_endpoint(entry.url), self.default_ttl)
+        return time.time() - entry.fetched_at < ttl
+
+    def refresh(self, entry: CacheEntry) -> None:
+        """Mark an entry as fresh again, eg after the server said it's not modified."""
+        self.n_revalidated += 1
+        self._write_entry(dataclasses.replace(entry, fetched_at=time.time()))
+
+    def prune(self) -> tuple[int, int]:
+        """Remove unused entries, and the bodies that no entry uses any more.
+
+        Entries not used for `max_unused` seconds are removed,
+        then the least recently used ones until the bodies fit in `max_bytes`.
+        Leftover temporary files from crashed writes are removed too.
+
+        Returns the number of entries and of bodies removed.
+        """
+        now = time.time()
+        entries = []
+        for path in self.directory.glob("entries/*/*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        entries.sort(reverse=True)
+        # body hash -> [(path, size)], more than one if written with both compressors.
+        bodies: dict[str, list[tuple[Path, int]]] = {}
+        for path in self.directory.glob("bodies/*/*"):
+            if path.name.endswith(".tmp"):
+                _remove_if_older(path, now - _HOUR)
+                continue
+            try:
+                size = path.stat().st_size
+            except FileNotFoundError:
+                continue
+            bodies.setdefault(path.name.split(".")[0], []).append((path, size))
+        for path in self.directory.glob("entries/*/*.tmp"):
+            _remove_if_older(path, now - _HOUR)
+
+        # Keep the most recently used entries, while they fit.
+        keep: set[str] = set()
+        n_bytes = 0
+        n_removed_entries = 0
+        for mtime, path in entries:
+            body_hash = _body_hash(path)
+            size = 0
+            if body_hash not in keep:
+                size = sum(n for _, n in bodies.get(body_hash, []))
+            if now - mtime > self.max_unused or (
+                self.max_bytes is not None and n_bytes + size > self.max_bytes
+            ):
+                path.unlink(missing_ok=True)
+                n_removed_entries += 1
+                continue
+            if body_hash is not None:
+                keep.add(body_hash)
+            n_bytes += size
+        n_removed_bodies = 0
+        for body_hash, paths in bodies.items():
+            if body_hash not in keep:
+                for path, _ in paths:
+                    path.unlink(missing_ok=True)
+                n_removed_bodies += 1
+        logger.info(
+            f"Pruned {n_removed_entries} entries and {n_removed_bodies} bodies "
+            f"from {self.directory}, keeping {len(entries) - n_removed_entries} "
+            f"entries with {n_bytes / 1e6:.0f} MB of bodies"
+        )
+        return n_removed_entries, n_removed_bodies
+
+    def prune_daily(self) -> None:
+        """`prune()`, unless that was already done in the last day."""
+        marker = self.directory / "last-pruned"
+        try:
+            if time.time() - marker.stat().st_mtime < _DAY:
+                return
+        except FileNotFoundError:
+            pass
+        self.prune()
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.touch()
+
+    def _write_entry(self, entry: CacheEntry) -> None:
+        _atomic_write(
+            self._entry_path(entry.key),
+            json.dumps(dataclasses.asdict(entry)).encode("utf-8"),
+        )
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / "entries" / key[:2] / f"{key}.json"
+
+    def _body_path(self, body_hash: str) -> Path:
+        suffix = ".zst" if zstandard is not None else ".gz"
+        path = self.directory / "bodies" / body_hash[:2] / f"{body_hash}{suffix}"
+        if not path.exists():
+            # Maybe it was written by an install that had a different compressor.
+            other_suffix = ".gz" if suffix == ".zst" else ".zst"
+            other = path.with_suffix(other_suffix)
+            if other.exists() and (other_suffix == ".gz" or zstandard is not None):
+                return other
+        return path
+
+
+def _body_hash(entry_path: Path) -> str | None:
+    try:
+        return json.loads(entry_path.read_text())["body_hash"]
+    except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+        return None
+
+
+def _remove_if_older(path: Path, cutoff: float) -> None:
+    try:
+        if path.stat().st_mtime < cutoff:
+            path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _key(url: str, headers: dict[str, str]) -> str:
+    parts = [url] + [headers.get(h, "") for h in KEY_HEADERS]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def _endpoint(url: str) -> str:
+    # eg https://www.akleg.gov/publicservice/basis/bills?json=true -> "bills"
+    # or https://www.akleg.gov/basis/Bill/Plaintext/34?Hsid=HB0001A -> "Plaintext"
+    segments = [s for s in urlparse(url).path.split("/") if s]
+    if "Plaintext" in segments:
+        return "Plaintext"
+    return segments[-1] if segments else ""
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
@@ -1,21 +1,52 @@
 import shutil
+from collections.abc import Collection
 from pathlib import Path
 
 from alaska_legislative_data import _db
 
+FORMATS = ("csv", "duckdb", "parquet")
+
+PARQUET_TABLES = {
+    "people": ("PersonId", False),
+    "members": ("MemberId", False),
+    "bills": ("BillId", True),
+    "votes": ("VoteId", True),
+    "choices": ("ChoiceId", True),
+    "bill_versions": ("BillVersionId", True),
+}
+"""The name of each exported Parquet table: (primary key, partitioned)."""
+
 
 def export(
     *,
     db: str | Path | _db.Backend | None = None,
     directory: str | Path = "export/",
+    formats: str | Collection[str] = ("csv", "duckdb"),
 ):
+    """Export the database to `directory`, replacing whatever is there.
+
+    Parameters
+    ----------
+    formats:
+        Any of "csv", "duckdb", and "parquet", eg `--formats=csv,parquet`
+        from the CLI. See `to_csvs`, `to_duckdb`, and `to_parquet`.
+    """
+    if isinstance(formats, str):
+        formats = formats.split(",")
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown formats {sorted(unknown)}, expected {FORMATS}")
     db = _db.get_db(db)
     directory = Path(directory)
     if directory.exists():
         shutil.rmtree(directory)
     directory.mkdir(exist_ok=True)
-    to_csvs(db, directory)
-    to_duckdb(db, directory / "ak_leg.duckdb")
+    if "csv" in formats:
+        to_csvs(db, directory)
+    if "parquet" in formats:
+        to_parquet(db, directory / "parquet")
+    if "duckdb" in formats:
+        to_duckdb(db, directory / "ak_leg.duckdb")
 
 
 def to_csvs(db: _db.Backend, dir: str | Path):
@@ -31,6 +62,56 @@ def to_csvs(db: _db.Backend, dir: str | Path):
     db.BillVersion.to_csv(dir / "bill_versions.csv")
 
 
+def to_parquet(db: _db.Backend, dir: str | Path):
+    """Export each table to zstd-compressed Parquet, sorted by primary key.
+
+    people and members are single files, eg `people.parquet`.
+    The bigger tables are Hive-partitioned by LegislatureNumber,
+    eg `votes/LegislatureNumber=34/data_0.parquet`,
+    so a reader can read just the legislatures it wants:
+
+        duckdb.sql(
+            "FROM read_parquet('export/parquet/votes/*/*.parquet', "
+            "hive_partitioning = true) WHERE LegislatureNumber = 34"
+        )
+
+    choices and bill_versions don't have a LegislatureNumber column,
+    so it comes from the start of their ID, eg "34:HB 16:A".
+
+    Each partition is written as its own sorted query to a single file.
+    DuckDB's PARTITION_BY writes rows in whatever order its threads finish,
+    so the files wouldn't be sorted.
+    """
+    dir = Path(dir)
+    dir.mkdir(parents=True, exist_ok=True)
+    tables = {
+        "people": db.Person,
+        "members": db.Member,
+        "bills": db.Bill,
+        "votes": db.Vote,
+        "choices": db.Choice,
+        "bill_versions": db.BillVersion,
+    }
+    for name, t in tables.items():
+        key, partitioned = PARQUET_TABLES[name]
+        if not partitioned:
+            t.order_by(key).to_parquet(dir / f"{name}.parquet", compression="zstd")
+            continue
+        if "LegislatureNumber" not in t.columns:
+            t = t.mutate(LegislatureNumber=t[key].split(":")[0].cast("int16"))
+        shutil.rmtree(dir / name, ignore_errors=True)
+        (dir / name).mkdir()
+        leg_nums = t.LegislatureNumber.as_table().distinct().to_pyarrow()
+        for leg_num in leg_nums["LegislatureNumber"].to_pylist():
+            partition = dir / name / f"LegislatureNumber={leg_num}"
+            partition.mkdir()
+            # Like PARTITION_BY, the partition column is only in the path.
+            rows = t.filter(t.LegislatureNumber == leg_num).drop("LegislatureNumber")
+            rows.order_by(key).to_parquet(
+                partition / "data_0.parquet", compression="zstd"
+            )
+
+
 def to_duckdb(db: _db.Backend, path: str | Path):
     """Export the entire database to a new .duckdb file."""
     path = Path(path)
@@ -0,0 +1,513 @@
+"""Shared HTTP plumbing for talking to akleg.gov.
+
+Every request made during a scrape should go through one `ClientPool`,
+so that TCP+TLS connections are kept alive and reused between requests,
+and so that connection limits actually apply across the whole scrape.
+
+    async with _http.client_pool() as pool:
+        await _low.members(session=34)
+        await _low.bills(session=34)
+    print(pool.stats, pool.limiter)
+
+Code that makes a request without an active pool (eg a notebook calling
+`await _low.members(session=34)` directly) gets a throwaway pool
+just for that request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import contextlib
+import contextvars
+import dataclasses
+import email.utils
+import importlib.util
+import logging
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Literal, Self, TypeVar
+from urllib.parse import urlparse
+
+import httpx
+
+from alaska_legislative_data import _cache
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class PoolStats:
+    """Counters for how well a `ClientPool` is reusing its connections."""
+
+    requests: int = 0
+    connections_opened: int = 0
+    """Number of requests that had to open a new TCP connection."""
+    connections_reused: int = 0
+    """Number of requests that were sent over an existing keep-alive connection."""
+
+
+class AdaptiveLimiter:
+    """Limits how hard we hit akleg.gov, adapting to how the server is coping.
+
+    This is an AIMD (additive increase, multiplicative decrease) limiter,
+    like TCP congestion control:
+    - Each request that comes back quickly and successfully
+      widens the concurrency limit a little bit (by about 1 per `limit` requests).
+    - A request that is slow shrinks the limit a little bit,
+      at most once every `target_latency` seconds.
+    - Each request that fails with a timeout, connection error, 5xx, 429,
+      or one of the `overload_errors` passed to `slot()`, halves the limit.
+
+    On top of that, a token bucket caps how many requests per second we start,
+    no matter how healthy the server looks.
+
+    Create a new one per scrape run. `ClientPool` does this for you.
+
+    Parameters
+    ----------
+    initial:
+        The starting number of concurrent requests.
+    minimum:
+        Never go below this many concurrent requests.
+    maximum:
+        Never go above this many concurrent requests.
+    target_latency:
+        Requests taking longer than this many seconds count as "slow".
+    max_rate:
+        The maximum number of requests to start per second.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int = 5,
+        minimum: int = 1,
+        maximum: int = 10,
+        target_latency: float = 5.0,
+        max_rate: float = 10.0,
+    ) -> None:
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.max_rate = max_rate
+        self.in_flight = 0
+        self.queue_depth = 0
+        """Number of requests waiting for a slot."""
+        self.n_successes = 0
+        self.n_overloads = 0
+        self._condition = asyncio.Condition()
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._last_decrease = 0.0
+        self._last_slow_decrease = 0.0
+        self._completed: collections.deque[float] = collections.deque()
+
+    @property
+    def rate(self) -> float:
+        """The observed number of requests completed per second, over the last 30s."""
+        now = time.monotonic()
+        while self._completed and self._completed[0] < now - 30:
+            self._completed.popleft()
+        return len(self._completed) / 30
+
+    def __repr__(self) -> str:
+        return (
+            f"AdaptiveLimiter(limit={self.limit:.1f}, in_flight={self.in_flight}, "
+            f"queue_depth={self.queue_depth}, rate={self.rate:.2f}/s)"
+        )
+
+    @contextlib.asynccontextmanager
+    async def slot(
+        self, *, overload_errors: tuple[type[BaseException], ...] = ()
+    ) -> AsyncIterator[None]:
+        """Wait for permission to make a request, then make it inside this block."""
+        self.queue_depth += 1
+        try:
+            async with self._condition:
+                await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+                self.in_flight += 1
+        finally:
+            self.queue_depth -= 1
+        try:
+            await self._take_token()
+            start = time.monotonic()
+            try:
+                yield
+            except BaseException as e:
+                if _is_overload(e, overload_errors):
+                    self._on_overload()
+                raise
+            else:
+                self._on_success(time.monotonic() - start)
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    async def _take_token(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self.max_rate, self._tokens + (now - self._last_refill) * self.max_rate
+            )
+            self._last_refill = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.max_rate)
+
+    def _on_success(self, latency: float) -> None:
+        self.n_successes += 1
+        self._completed.append(time.monotonic())
+        if latency <= self.target_latency:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            return
+        now = time.monotonic()
+        # Requests that were in flight together are usually slow together,
+        # eg while the server is busy. Like overloads, only count that once.
+        if now - self._last_slow_decrease < self.target_latency:
+            return
+        self._last_slow_decrease = now
+        self.limit = max(self.minimum, self.limit * 0.9)
+
+    def _on_overload(self) -> None:
+        self.n_overloads += 1
+        now = time.monotonic()
+        # All the requests that were in flight when the server started struggling
+        # will probably fail together. Only count that as one signal.
+        if now - self._last_decrease < self.target_latency:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit / 2)
+        logger.warning(f"akleg.gov is struggling, backing off to {self!r}")
+
+
+def _is_overload(
+    e: BaseException, overload_errors: tuple[type[BaseException], ...]
+) -> bool:
+    if isinstance(e, overload_errors):
+        return True
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code >= 500 or e.response.status_code == 429
+    return isinstance(e, (httpx.TimeoutException, httpx.TransportError))
+
+
+class ClientPool:
+    """A long-lived httpx client shared by every request in a scrape run.
+
+    Parameters
+    ----------
+    max_connections:
+        The maximum number of open connections, across all hosts.
+    max_connections_per_host:
+        The maximum number of concurrent requests to any single host.
+        akleg.gov is easy to overwhelm, so keep this small.
+    keepalive_expiry:
+        How many seconds an idle connection is kept open for reuse.
+    http2:
+        Whether to try to use HTTP/2. Requires the `h2` package,
+        if it isn't installed we fall back to HTTP/1.1.
+    timeout:
+        The default timeout in seconds for each request.
+    limiter:
+        The `AdaptiveLimiter` that callers should make their requests through.
+        If not given, a new one is made, so each pool gets its own.
+    cache:
+        The `ResponseCache` that `fetch()` reads from and writes to.
+        If not given, uses `ResponseCache.from_env()`.
+        Pass `False` to disable caching.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = 20,
+        max_connections_per_host: int = 10,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        timeout: float = 30.0,
+        limiter: AdaptiveLimiter | None = None,
+        cache: _cache.ResponseCache | Literal[False] | None = None,
+    ) -> None:
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("http2 requested but `h2` is not installed, using HTTP/1.1")
+            http2 = False
+        self.max_connections_per_host = max_connections_per_host
+        self.stats = PoolStats()
+        if limiter is None:
+            limiter = AdaptiveLimiter(maximum=max_connections_per_host)
+        self.limiter = limiter
+        if cache is None:
+            cache = _cache.ResponseCache.from_env()
+        self.cache = cache or None
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, pool=timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+            follow_redirects=True,
+        )
+
+    async def get(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        timeout: float | httpx.Timeout | None = None,
+    ) -> httpx.Response:
+        """GET a url, reusing a pooled connection if one is available."""
+        return await self.request("GET", url, headers=headers, timeout=timeout)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        timeout: float | httpx.Timeout | None = None,
+    ) -> httpx.Response:
+        """Make a request, reusing a pooled connection if one is available."""
+        opened = False
+
+        async def trace(event_name: str, info: dict) -> None:
+            nonlocal opened
+            if event_name == "connection.connect_tcp.complete":
+                opened = True
+
+        kwargs = {} if timeout is None else {"timeout": timeout}
+        async with self._host_semaphore(url):
+            try:
+                return await self._client.request(
+                    method,
+                    url,
+                    headers=headers,
+                    extensions={"trace": trace},
+                    **kwargs,
+                )
+            finally:
+                self.stats.requests += 1
+                if opened:
+                    self.stats.connections_opened += 1
+                else:
+                    self.stats.connections_reused += 1
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).hostname or ""
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(
+                self.max_connections_per_host
+            )
+        return self._host_semaphores[host]
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+        if self.stats.requests:
+            logger.info(
+                f"Made {self.stats.requests} requests, "
+                f"opened {self.stats.connections_opened} connections, "
+                f"reused a connection {self.stats.connections_reused} times, "
+                f"ended with {self.limiter!r}"
+            )
+        if self.cache is not None:
+            logger.info(f"{self.cache!r}")
+            await asyncio.to_thread(self.cache.prune_daily)
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+_current_pool: contextvars.ContextVar[ClientPool | None] = contextvars.ContextVar(
+    "alaska_legislative_data_client_pool", default=None
+)
+
+
+def current_pool() -> ClientPool | None:
+    """The `ClientPool` of the currently running scrape, if there is one."""
+    return _current_pool.get()
+
+
+@contextlib.asynccontextmanager
+async def client_pool(**kwargs) -> AsyncIterator[ClientPool]:
+    """Share one `ClientPool` between every request made inside this block.
+
+    If a pool is already active (eg this is nested inside another scrape),
+    that pool is reused and `kwargs` are ignored.
+    """
+    existing = _current_pool.get()
+    if existing is not None:
+        yield existing
+        return
+    async with ClientPool(**kwargs) as pool:
+        token = _current_pool.set(pool)
+        try:
+            yield pool
+        finally:
+            _current_pool.reset(token)
+
+
+async def fetch(
+    url: str,
+    *,
+    headers: dict[str, str],
+    parse: Callable[[bytes], T],
+    timeout: float | httpx.Timeout | None = None,
+    overload_errors: tuple[type[BaseException], ...] = (),
+    ttl: float | None = None,
+) -> T:
+    """GET a url through the current pool's cache and limiter, and parse the body.
+
+    `parse` is given the raw bytes of the body, so it can avoid
+    decoding them to a str if it doesn't need to.
+    It should raise if the body is an error message, so that we don't cache it.
+
+    `ttl` overrides how old a cached response may be, in seconds.
+    With 0, the server is always asked (though it may say our copy is current).
+    """
+    return await _fetch(
+        url,
+        headers=headers,
+        parse=lambda raw, encoding: parse(raw),
+        timeout=timeout,
+        overload_errors=overload_errors,
+        ttl=ttl,
+    )
+
+
+async def fetch_text(
+    url: str,
+    *,
+    headers: dict[str, str],
+    timeout: float | httpx.Timeout | None = None,
+    overload_errors: tuple[type[BaseException], ...] = (),
+) -> str:
+    """Like `fetch()`, but decode the body with the charset the server sent.
+
+    If it didn't send one, assume UTF-8.
+    Anything that doesn't decode is replaced with U+FFFD.
+    """
+    return await _fetch(
+        url,
+        headers=headers,
+        parse=lambda raw, encoding: raw.decode(encoding or "utf-8", errors="replace"),
+        timeout=timeout,
+        overload_errors=overload_errors,
+        ttl=None,
+    )
+
+
+async def _fetch(
+    url: str,
+    *,
+    headers: dict[str, str],
+    parse: Callable[[bytes, str | None], T],
+    timeout: float | httpx.Timeout | None,
+    overload_errors: tuple[type[BaseException], ...],
+    ttl: float | None,
+) -> T:
+    """`fetch()`, but `parse` is also given the encoding of the response."""
+    async with client_pool() as pool:
+        # The cache's disk reads, (de)compression and writes go to a thread,
+        # so they don't hold up every other request on the event loop.
+        cache = pool.cache
+        entry = None
+        if cache is not None:
+            entry = await asyncio.to_thread(cache.lookup, url, headers, ttl=ttl)
+        if entry is not None and cache.is_fresh(entry, ttl=ttl):
+            return parse(await asyncio.to_thread(cache.read, entry), entry.encoding)
+
+        request_headers = headers
+        if entry is not None:
+            request_headers = {**headers, **entry.validators()}
+        async with pool.limiter.slot(overload_errors=overload_errors):
+            response = await pool.get(url, headers=request_headers, timeout=timeout)
+            if response.status_code == 304 and entry is not None:
+                await asyncio.to_thread(cache.refresh, entry)
+                raw = await asyncio.to_thread(cache.read, entry)
+                return parse(raw, entry.encoding)
+            response.raise_for_status()
+            result = parse(response.content, response.encoding)
+        if cache is not None:
+            await asyncio.to_thread(cache.store, url, headers, response)
+        return result
+
+
+async def with_retries(
+    f: Callable[[], Awaitable[T]],
+    *,
+    max_retries: int,
+    exception_classes: tuple[type[BaseException], ...] = (Exception,),
+    give_up: Callable[[BaseException], bool] | None = None,
+    base_delay: float = 0.5,
+    max_delay: float = 30.0,
+    max_retry_after: float = 120.0,
+) -> T:
+    """Call `f()` until it succeeds, sleeping longer and longer between tries.
+
+    The sleeps grow exponentially from `base_delay`, capped at `max_delay`,
+    and are jittered so that many requests that failed together
+    (eg when akleg.gov had a hiccup) don't all retry in lockstep.
+    If the server sent a `Retry-After` header, we wait at least that long,
+    up to `max_retry_after`.
+
+    Parameters
+    ----------
+    f:
+        The coroutine function to call.
+    max_retries:
+        The total number of tries. After the last one fails,
+        raise a RuntimeError from the last error.
+    exception_classes:
+        Only retry these errors, anything else is raised immediately.
+    give_up:
+        If given, and this returns True for an error (eg a 404),
+        raise it immediately instead of retrying.
+    """
+    for i in range(max_retries):
+        try:
+            return await f()
+        except exception_classes as e:
+            if give_up is not None and give_up(e):
+                raise
+            if i == max_retries - 1:
+                raise RuntimeError(f"Failed {max_retries} times") from e
+            delay = min(max_delay, base_delay * 2**i)
+            # "equal jitter": sleep somewhere between half and all of the delay
+            delay = delay / 2 + random.uniform(0, delay / 2)
+            retry_after = _retry_after(e)
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, max_retry_after))
+            logger.warning(
+                f"Retrying {i + 1}/{max_retries} in {delay:.1f}s after error: {e!r}"
+            )
+            await asyncio.sleep(delay)
+    raise ValueError("max_retries must be at least 1")
+
+
+def _retry_after(e: BaseException) -> float | None:
+    """The number of seconds the server asked us to wait, if it said."""
+    if not isinstance(e, httpx.HTTPStatusError):
+        return None
+    value = e.response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
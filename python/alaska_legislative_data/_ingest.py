@@ -1,20 +1,37 @@
 import asyncio
+import contextlib
+import contextvars
+import datetime
 import logging
+import time
+from collections.abc import Callable, Collection, Iterator
+from typing import TypeVar
 
 import ibis
+import pyarrow as pa
 from ibis import _
+from ibis.backends.sql.datatypes import DuckDBType
 
 from alaska_legislative_data import (
     _curated,
     _db,
+    _http,
+    _low,
     _parse,
     _scrape,
     _split_choices,
+    _spool,
     _util,
 )
 
+T = TypeVar("T")
+
 logger = logging.getLogger(__name__)
 
+_db_lock: contextvars.ContextVar[asyncio.Lock | None] = contextvars.ContextVar(
+    "alaska_legislative_data_db_lock", default=None
+)
+
 
 def ingest_all(
     db: str | _db.Backend | None = None,
@@ -26,14 +43,184 @@ def ingest_all(
     bills: ibis.Table | None = None,
     votes: ibis.Table | None = None,
     choices: ibis.Table | None = None,
+    incremental_votes: bool = True,
+    time_budget: float | None = None,
+    deadline: str | datetime.datetime | None = None,
 ):
+    asyncio.run(
+        ingest_all_async(
+            db,
+            legislatures=legislatures,
+            sessions=sessions,
+            people=people,
+            members=members,
+            bills=bills,
+            votes=votes,
+            choices=choices,
+            incremental_votes=incremental_votes,
+            time_budget=time_budget,
+            deadline=deadline,
+        )
+    )
+
+
+async def ingest_all_async(
+    db: str | _db.Backend | None = None,
+    *,
+    legislatures: ibis.Table | None = None,
+    sessions: ibis.Table | None = None,
+    people: ibis.Table | None = None,
+    members: ibis.Table | None = None,
+    bills: ibis.Table | None = None,
+    votes: ibis.Table | None = None,
+    choices: ibis.Table | None = None,
+    incremental_votes: bool = True,
+    time_budget: float | None = None,
+    deadline: str | datetime.datetime | None = None,
+) -> dict[str, float]:
+    """Ingest everything, running stages concurrently where the data allows.
+
+    The stages depend on each other like this:
+
+        people -> members ---+--> votes and choices
+        bills ---------------+
+              `--> bill versions
+
+    So eg the bills are scraped while the people and members are inserted,
+    and the votes and the bill versions are scraped at the same time.
+    Every stage shares one event loop and one HTTP connection pool.
+    Database calls are run one at a time, in a worker thread,
+    so they don't block the scrapers.
+
+    With `incremental_votes=False`, every vote of the latest legislature
+    is re-scraped, see `_scrape_missing_votes_and_choices_async`.
+
+    `time_budget` is a number of seconds, and `deadline` an ISO 8601 datetime
+    (local time if it has no timezone), eg "2025-03-01T06:00:00-09:00".
+    If either is given, no new scrapes are started once most of the time
+    is used up, leaving the rest for inserting what was already scraped.
+    The work is ordered newest legislature first, so the current legislature
+    is kept up to date, and the history is filled in as time allows.
+    What is deferred is logged, and the next run picks it up,
+    since each run plans its work from what is in the database.
+
+    Returns the number of seconds each stage took.
+    """
     db = _db.get_db(db)
-    # ingest_legislatures_and_sessions(db, legislatures=legislatures, sessions=sessions)
-    ingest_people(db, people=people)
-    ingest_members(db, members=members)
-    ingest_bills(db, new_bills=bills)
-    ingest_votes_and_choices(db, votes=votes, choices=choices)
-    ingest_bill_versions(db=db)
+    timings: dict[str, float] = {}
+    stop_scraping_at = _stop_scraping_at(time_budget=time_budget, deadline=deadline)
+    token = _db_lock.set(asyncio.Lock())
+    try:
+        async with _http.client_pool():
+
+            async def people_and_members():
+                with _timed(timings, "people"):
+                    await _in_db(ingest_people, db, people=people)
+                with _timed(timings, "members"):
+                    await _in_db(ingest_members, db, members=members)
+
+            async def ingest_bills_stage():
+                with _timed(timings, "bills"):
+                    new_bills = bills
+                    if new_bills is None:
+                        existing_bills = await _in_db(getattr, db, "Bill")
+                        new_bills = await _scrape_missing_bills_async(
+                            existing_bills=existing_bills
+                        )
+                    await _in_db(ingest_bills, db, new_bills=new_bills)
+
+            async def votes_and_choices_stage():
+                await asyncio.gather(people_and_members_task, bills_task)
+                with _timed(timings, "votes and choices"):
+                    await _ingest_votes_and_choices_async(
+                        db,
+                        votes=votes,
+                        choices=choices,
+                        incremental=incremental_votes,
+                    )
+
+            async def bill_versions_stage():
+                await bills_task
+                with _timed(timings, "bill versions"):
+                    await ingest_bill_versions_async(db=db)
+
+            # ingest_legislatures_and_sessions(db, legislatures=legislatures, sessions=sessions)
+            with _timed(timings, "total"), _scrape.deadline(stop_scraping_at):
+                # Tasks copy the context they're created in,
+                # so create them inside the deadline, or they won't see it.
+                people_and_members_task = asyncio.create_task(people_and_members())
+                bills_task = asyncio.create_task(ingest_bills_stage())
+                await asyncio.gather(
+                    people_and_members_task,
+                    bills_task,
+                    votes_and_choices_stage(),
+                    bill_versions_stage(),
+                )
+    finally:
+        _db_lock.reset(token)
+    logger.info(
+        "Stage timings: "
+        + ", ".join(f"{stage}={seconds:.1f}s" for stage, seconds in timings.items())
+    )
+    logger.info(f"{_low.default_memo()!r}")
+    return timings
+
+
+def _stop_scraping_at(
+    *,
+    time_budget: float | None,
+    deadline: str | datetime.datetime | None,
+    reserve: float = 0.2,
+) -> float | None:
+    """When to stop starting new scrapes, as a `time.monotonic()` value.
+
+    Parameters
+    ----------
+    time_budget
+        The number of seconds we have, from now.
+    deadline
+        When we have to be done by.
+    reserve
+        The fraction of the time to leave for inserting what was scraped.
+    """
+    seconds = []
+    if time_budget is not None:
+        seconds.append(float(time_budget))
+    if deadline is not None:
+        if isinstance(deadline, str):
+            deadline = datetime.datetime.fromisoformat(deadline)
+        if deadline.tzinfo is None:
+            deadline = deadline.astimezone()
+        seconds.append((deadline - datetime.datetime.now(datetime.UTC)).total_seconds())
+    if not seconds:
+        return None
+    budget = min(seconds)
+    logger.info(f"Scraping for at most {budget * (1 - reserve):.0f}s of {budget:.0f}s")
+    return time.monotonic() + budget * (1 - reserve)
+
+
+@contextlib.contextmanager
+def _timed(timings: dict[str, float], stage: str) -> Iterator[None]:
+    logger.info(f"Starting stage {stage}")
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        timings[stage] = time.monotonic() - start
+        logger.info(f"Finished stage {stage} in {timings[stage]:.1f}s")
+
+
+async def _in_db(f: Callable[..., T], /, *args, **kwargs) -> T:
+    """Run a blocking database call in a worker thread.
+
+    Inside `ingest_all_async`, calls are serialized, since the stages share
+    one database connection, and those aren't safe to use from two threads at once.
+    """
+    lock = _db_lock.get()
+    if lock is None:
+        return await asyncio.to_thread(f, *args, **kwargs)
+    async with lock:
+        return await asyncio.to_thread(f, *args, **kwargs)
 
 
 def ingest_legislatures_and_sessions(
@@ -58,29 +245,12 @@ def ingest_legislatures_and_sessions(
     logger.info(f"Ingesting {legislatures.count().execute()} legislatures")
     logger.info(f"Ingesting {sessions.count().execute()} sessions")
 
-    n_existing_legs = (
-        legislatures.semi_join(db.Legislature, "LegislatureNumber").count().execute()
+    changes = _db.upsert(db, "legislatures", legislatures, key="LegislatureNumber")
+    logger.info(f"Legislatures: {changes}")
+    changes = _db.upsert(
+        db, "legislature_sessions", sessions, key="LegislatureSessionId"
     )
-    new_legs = legislatures.anti_join(db.Legislature, "LegislatureNumber")
-    n_new_legs = new_legs.count().execute()
-    logger.info(f"Found {n_existing_legs} existing legislatures")
-    logger.info(f"Found {n_new_legs} new legislatures")
-    if n_new_legs > 0:
-        logger.info(f"Adding {n_new_legs} new legislatures")
-        db.insert("legislatures", new_legs)
-
-    n_existing_sess = (
-        sessions.semi_join(db.LegislatureSession, "LegislatureSessionId")
-        .count()
-        .execute()
-    )
-    new_sess = sessions.anti_join(db.LegislatureSession, "LegislatureSessionId")
-    n_new_sess = new_sess.count().execute()
-    logger.info(f"Found {n_existing_sess} existing sessions")
-    logger.info(f"Found {n_new_sess} new sessions")
-    if n_new_sess > 0:
-        logger.info(f"Adding {n_new_sess} new sessions")
-        db.insert("legislature_sessions", new_sess)
+    logger.info(f"Sessions: {changes}")
 
 
 def ingest_people(
@@ -102,14 +272,8 @@ def ingest_people(
             f"Some people are in the database but not in the curated list: {only_new}"
         )
 
-    n_existing_people = people.semi_join(db.Person, "PersonId").count().execute()
-    new_people = people.anti_join(db.Person, "PersonId")
-    n_new_people = new_people.count().execute()
-    logger.info(f"Found {n_existing_people} existing people")
-    logger.info(f"Found {n_new_people} new people")
-    if n_new_people > 0:
-        logger.info(f"Adding {n_new_people} new people")
-        db.insert("people", new_people)
+    changes = _db.upsert(db, "people", people, key="PersonId")
+    logger.info(f"People: {changes}")
 
 
 def ingest_members(
@@ -131,26 +295,16 @@ def ingest_members(
             f"Some members are in the database but not in the new list: {only_new}"
         )
 
-    missing_person = members.anti_join(db.Person, "PersonId").to_pandas()
-    if not missing_person.empty:
-        raise ValueError(
-            f"Some new members don't have an existing person: {missing_person}"
-        )
+    _db.check_references(db, {"members": members})
 
     dupe_member_id = members.MemberId.topk(10, name="n").filter(_.n > 1).to_pandas()
     if not dupe_member_id.empty:
         raise ValueError(f"Some new members have duplicate MemberId: {dupe_member_id}")
 
-    n_existing_members = members.semi_join(db.Member, "MemberId").count().execute()
-    new_members = (
-        members.select(*db.Member.columns).anti_join(db.Member, "MemberId").cache()
+    changes = _db.upsert(
+        db, "members", members.select(*db.Member.columns), key="MemberId"
     )
-    n_new_members = new_members.count().execute()
-    logger.info(f"Found {n_existing_members} existing members")
-    logger.info(f"Found {n_new_members} new members")
-    if n_new_members > 0:
-        logger.info(f"Adding {n_new_members} new members")
-        db.insert("members", new_members)
+    logger.info(f"Members: {changes}")
 
 
 def ingest_bills(
@@ -165,14 +319,9 @@ def ingest_bills(
     new_bills = ibis.memtable(new_bills.to_pyarrow(), schema=new_bills.schema())
     logger.info(f"Ingesting {new_bills.count().execute()} bills")
 
-    n_existing_bills = new_bills.semi_join(db.Bill, "BillId").count().execute()
-    new_bills = new_bills.select(*db.Bill.columns).anti_join(db.Bill, "BillId").cache()
-    n_new_bills = new_bills.count().execute()
-    logger.info(f"Found {n_existing_bills} existing bills")
-    logger.info(f"Found {n_new_bills} new bills")
-    if n_new_bills > 0:
-        logger.info(f"Adding {n_new_bills} new bills")
-        db.insert("bills", new_bills)
+    _db.check_references(db, {"bills": new_bills})
+    changes = _db.upsert(db, "bills", new_bills.select(*db.Bill.columns), key="BillId")
+    logger.info(f"Bills: {changes}")
 
 
 def ingest_votes_and_choices(
@@ -180,15 +329,42 @@ def ingest_votes_and_choices(
     *,
     votes: ibis.Table | None = None,
     choices: ibis.Table | None = None,
+    incremental: bool = True,
+):
+    asyncio.run(
+        _ingest_votes_and_choices_async(
+            db, votes=votes, choices=choices, incremental=incremental
+        )
+    )
+
+
+async def _ingest_votes_and_choices_async(
+    db: str | _db.Backend,
+    *,
+    votes: ibis.Table | None = None,
+    choices: ibis.Table | None = None,
+    incremental: bool = True,
 ):
     db = _db.get_db(db)
+    spool = None
     if votes is None or choices is None:
-        v, c = _scrape_missing_votes_and_choices(db)
+        spool = _vote_spool()
+        v, c = await _scrape_missing_votes_and_choices_async(
+            db, spool=spool, incremental=incremental
+        )
         if votes is None:
             votes = v
         if choices is None:
             choices = c
+    await _in_db(_insert_votes_and_choices, db, votes=votes, choices=choices)
+    if spool is not None:
+        # Everything is safely in the database, next time start from scratch.
+        spool.clear()
+
 
+def _insert_votes_and_choices(
+    db: _db.Backend, *, votes: ibis.Table, choices: ibis.Table
+) -> None:
     # avoid https://github.com/ibis-project/ibis/issues/10942
     votes = ibis.memtable(votes.to_pyarrow(), schema=votes.schema())
     choices = ibis.memtable(choices.to_pyarrow(), schema=choices.schema())
@@ -196,28 +372,68 @@ def ingest_votes_and_choices(
     logger.info(f"Ingesting {votes.count().execute()} votes")
     logger.info(f"Ingesting {choices.count().execute()} choices")
 
-    votes = votes.mutate(VoteDescription=ibis.literal(""))
-    n_existing_votes = votes.semi_join(db.Vote, "VoteId").count().execute()
-    new_votes = votes.anti_join(db.Vote, "VoteId")
-    n_new_votes = new_votes.count().execute()
-    logger.info(f"Found {n_existing_votes} existing votes")
-    logger.info(f"Found {n_new_votes} new votes")
-    if n_new_votes > 0:
-        logger.info(f"Adding {n_new_votes} new votes")
-        db.insert("votes", new_votes)
-
-    n_existing_choices = choices.semi_join(db.Choice, "ChoiceId").count().execute()
-    new_choices = choices.anti_join(db.Choice, "ChoiceId")
-    n_new_choices = new_choices.count().execute()
-    logger.info(f"Found {n_existing_choices} existing choices")
-    logger.info(f"Found {n_new_choices} new choices")
-    if n_new_choices > 0:
-        logger.info(f"Adding {n_new_choices} new choices")
-        db.insert("choices", new_choices)
-
-
-def bills_needing_version_updates(backend: _db.Backend) -> list[_scrape.BillSpec]:
-    latest_leg_num = backend.Bill.LegislatureNumber.max().execute()
+    _db.check_references(db, {"votes": votes, "choices": choices})
+    # We don't scrape VoteDescription, so leave the existing ones alone.
+    changes = _db.upsert(
+        db, "votes", votes, key="VoteId", defaults={"VoteDescription": ""}
+    )
+    logger.info(f"Votes: {changes}")
+    changes = _db.upsert(db, "choices", choices, key="ChoiceId")
+    logger.info(f"Choices: {changes}")
+
+
+def bills_needing_version_updates(
+    backend: _db.Backend, *, incremental: bool = True
+) -> list[_scrape.BillSpec]:
+    """Which bills (and which of their versions) we need to scrape.
+
+    Bills in older legislatures are only scraped if we have no versions for them.
+
+    For the latest legislature, if `incremental` is False, every bill is re-scraped.
+    Otherwise, we make one cheap request for the listing of every bill's versions,
+    compare it with what we already have in the BillVersion table,
+    and only scrape the versions we are missing.
+    (Versions we have that changed, eg that just passed a chamber,
+    don't need scraping, see `_changed_bills`.)
+    """
+    return asyncio.run(
+        bills_needing_version_updates_async(backend, incremental=incremental)
+    )
+
+
+async def bills_needing_version_updates_async(
+    backend: _db.Backend, *, incremental: bool = True
+) -> list[_scrape.BillSpec]:
+    specs, _listed, _changed = await _version_updates(backend, incremental=incremental)
+    return specs
+
+
+async def _version_updates(
+    backend: _db.Backend, *, incremental: bool = True
+) -> tuple[list[_scrape.BillSpec], dict[int, dict[str, _low.Bill]], list[dict]]:
+    """`bills_needing_version_updates_async`, and what `_changed_bills` found.
+
+    That is, the bills to scrape, the listed bills of the latest legislature
+    (for `_scrape.stream_bill_versions(details=...)`),
+    and the rows of the versions we have that changed.
+    """
+    specs = await _in_db(_bills_without_versions, backend, incremental=incremental)
+    if not incremental:
+        return specs, {}, []
+    latest_leg_num = await _in_db(_latest_leg_num, backend)
+    new_specs, listed, changed = await _changed_bills(backend, latest_leg_num)
+    # The latest legislature first, in case we run out of time.
+    return new_specs + specs, {latest_leg_num: listed}, changed
+
+
+def _latest_leg_num(backend: _db.Backend) -> int:
+    return backend.Bill.LegislatureNumber.max().execute()
+
+
+def _bills_without_versions(
+    backend: _db.Backend, *, incremental: bool
+) -> list[_scrape.BillSpec]:
+    latest_leg_num = _latest_leg_num(backend)
     t = backend.Bill.filter(
         backend.Bill.LegislatureNumber > 25,
         ibis.or_(
@@ -225,17 +441,90 @@ def bills_needing_version_updates(backend: _db.Backend) -> list[_scrape.BillSpec
             backend.Bill.BillId.notin(backend.BillVersion.BillId),
         ),
     )
-    return (
+    if incremental:
+        t = t.filter(backend.Bill.LegislatureNumber < latest_leg_num)
+    specs = (
         t.select(
             backend.Bill.LegislatureNumber,
             backend.Bill.BillNumber,
         )
         .order_by(
-            backend.Bill.LegislatureNumber.asc(),
+            backend.Bill.LegislatureNumber.desc(),
         )
         .to_pandas()
         .to_dict(orient="records")
     )
+    return specs
+
+
+async def _changed_bills(
+    backend: _db.Backend, leg_num: int
+) -> tuple[list[_scrape.BillSpec], dict[str, _low.Bill], list[dict]]:
+    """Compare the listing of a legislature's bill versions with what we have.
+
+    Returns the bills with versions that we don't have yet,
+    every listed bill, keyed by cleaned BillNumber,
+    and the rows of the versions we have whose listing changed,
+    eg the version passed the Senate since we scraped it.
+    Those rows are built straight from the listing, without BillVersionFullText,
+    since the text of a version doesn't change and we already have it.
+    """
+    listings = await _scrape.scrape_bill_version_listings_async([leg_num])
+    known_bill_ids, existing = await _in_db(_existing_versions, backend, leg_num)
+
+    specs = []
+    listed = {}
+    changed = []
+    for bill in listings:
+        bill_number = _scrape.clean_bill_number(bill["BillNumber"])
+        bill_id = f"{leg_num}:{bill_number}"
+        if bill_id not in known_bill_ids:
+            # We can't insert versions of a bill that isn't in the Bill table yet.
+            continue
+        listed[bill_number] = bill
+        rows = await _scrape._prep_bill_versions(leg_num, bill, full_text=False)
+        missing = []
+        for row in rows:
+            have = existing.get(row["BillVersionId"])
+            if have is None:
+                missing.append(row["BillVersionLetter"])
+            elif have != row:
+                changed.append(row)
+        if missing:
+            specs.append(
+                {
+                    "LegislatureNumber": leg_num,
+                    "BillNumber": bill_number,
+                    "VersionLetters": sorted(missing),
+                }
+            )
+    logger.info(
+        f"{len(specs)} of {len(listings)} bills in legislature {leg_num} "
+        f"have new versions, and {len(changed)} versions changed"
+    )
+    return specs, listed, changed
+
+
+def _existing_versions(
+    backend: _db.Backend, leg_num: int
+) -> tuple[set[str], dict[str, dict]]:
+    """The BillIds in a legislature, and the versions we have, by BillVersionId.
+
+    The versions are without their BillVersionFullText.
+    """
+    versions = backend.BillVersion
+    existing = (
+        versions.filter(versions.BillId.startswith(f"{leg_num}:"))
+        .drop("BillVersionFullText")
+        .to_pyarrow()
+        .to_pylist()
+    )
+    known_bill_ids = set(
+        backend.Bill.filter(backend.Bill.LegislatureNumber == leg_num)
+        .BillId.execute()
+        .tolist()
+    )
+    return known_bill_ids, {row["BillVersionId"]: row for row in existing}
 
 
 def scrape_bill_versions(
@@ -243,67 +532,131 @@ def scrape_bill_versions(
     db: _db.Backend | str | None = None,
     bills: list[_scrape.BillSpec] | None = None,
 ):
-    """Scrape the bill versions and insert them into the database."""
+    """Scrape the bill versions, without inserting them into the database."""
+    return asyncio.run(scrape_bill_versions_async(db=db, bills=bills))
+
+
+async def scrape_bill_versions_async(
+    *,
+    db: _db.Backend | str | None = None,
+    bills: list[_scrape.BillSpec] | None = None,
+) -> list[dict]:
     db = _db.get_db(db)
+    listed, changed = {}, []
     if bills is None:
-        bills = bills_needing_version_updates(db)
-    logger.info(f"Scraping bill versions for {len(bills)} bills")
+        bills, listed, changed = await _version_updates(db)
     bills = list(bills)
-    # Do in chunks so that if we error, we still have made some progress
-    MAX_BILLS = 50
-    if len(bills) > MAX_BILLS:
-        results = []
-        for chunk in _util.chunks(bills, MAX_BILLS):
-            results.extend(scrape_bill_versions(db=db, bills=chunk))
-        return results
-
-    tasks = [
-        _scrape.scrape_bill_versions(
-            leg_num=spec["LegislatureNumber"], bill_number=spec["BillNumber"]
-        )
-        for spec in bills
-    ]
-
-    async def main():
-        return await asyncio.gather(*tasks)
-
-    task_results = asyncio.run(main())
-    bill_versions = []
-    for task_result in task_results:
-        bill_versions.extend(task_result)
+    logger.info(f"Scraping bill versions for {len(bills)} bills")
+    bill_versions = list(changed)
+    async with _http.client_pool():
+        async for versions in _scrape.stream_bill_versions(bills, details=listed):
+            bill_versions.extend(versions)
     return bill_versions
 
 
 def ingest_bill_versions(
     *,
     db: _db.Backend | str | None = None,
-    bill_versions=None,
-):
-    """Scrape the bill versions and insert them into the database."""
+    bill_versions: list[dict] | None = None,
+) -> _db.ChangeSummary:
+    """Scrape the bill versions and upsert them into the database."""
     db = _db.get_db(db)
-    if bill_versions is None:
-        bill_versions = scrape_bill_versions(db=db)
-    inserted = _insert_bill_versions(db, bill_versions)
-    return inserted
+    if bill_versions is not None:
+        return _insert_bill_versions(db, bill_versions)
+    return asyncio.run(ingest_bill_versions_async(db=db))
+
+
+async def ingest_bill_versions_async(
+    *,
+    db: _db.Backend | str | None = None,
+    bills: list[_scrape.BillSpec] | None = None,
+    batch_size: int = 200,
+    max_queued_batches: int = 2,
+) -> _db.ChangeSummary:
+    """Scrape the bill versions, inserting them while the rest are still downloading.
+
+    A producer scrapes versions and groups them into Arrow tables of `batch_size`
+    versions. These go onto a queue of at most `max_queued_batches`,
+    and a consumer inserts them into the database one at a time.
+    So the network and the database are both kept busy,
+    and if the database is slow, the queue fills up and the scraping pauses.
+    At most about `max_queued_batches + 1` batches are held in memory,
+    plus whatever versions the scrapers are in the middle of.
+
+    Returns how many bill versions were inserted, updated, and unchanged.
+    """
+    db = _db.get_db(db)
+    listed, changed = {}, []
+    if bills is None:
+        bills, listed, changed = await _version_updates(db)
+    bills = list(bills)
+    total = _db.ChangeSummary()
+    if changed:
+        # These need no scraping, so are done first.
+        total = await _in_db(_insert_bill_versions, db, changed)
+    logger.info(f"Scraping bill versions for {len(bills)} bills")
+    schema = (await _in_db(_bill_version_schema, db)).to_pyarrow()
+    queue: asyncio.Queue[pa.Table | None] = asyncio.Queue(maxsize=max_queued_batches)
+
+    async def produce() -> None:
+        buffer: list[dict] = []
+        async with _http.client_pool():
+            async for versions in _scrape.stream_bill_versions(bills, details=listed):
+                buffer.extend(versions)
+                if len(buffer) >= batch_size:
+                    await queue.put(pa.Table.from_pylist(buffer, schema=schema))
+                    buffer = []
+        if buffer:
+            await queue.put(pa.Table.from_pylist(buffer, schema=schema))
+        await queue.put(None)
+
+    async def consume() -> _db.ChangeSummary:
+        total = _db.ChangeSummary()
+        while (batch := await queue.get()) is not None:
+            total += await _in_db(_insert_bill_versions, db, batch)
+        return total
+
+    # If either side fails, the TaskGroup cancels the other,
+    # so eg the producer isn't left blocked on a full queue.
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(produce())
+        consumer = tg.create_task(consume())
+    total += consumer.result()
+    logger.info(f"Bill versions in total: {total}")
+    return total
+
+
+def _bill_version_schema(db: _db.Backend) -> ibis.Schema:
+    return db.BillVersion.schema()
 
 
 def _insert_bill_versions(
     db: _db.Backend,
-    versions: list[dict],
-) -> list[dict]:
-    """Insert the bill versions into the database."""
-    new = ibis.memtable(versions, schema=db.BillVersion.schema())
+    versions: list[dict] | pa.Table,
+) -> _db.ChangeSummary:
+    """Upsert the bill versions into the database.
+
+    Versions without BillVersionFullText (see `_changed_bills`)
+    keep the text we have.
+    """
+    if not isinstance(versions, pa.Table):
+        schema = db.BillVersion.schema().to_pyarrow()
+        with_text = [v for v in versions if "BillVersionFullText" in v]
+        without_text = [v for v in versions if "BillVersionFullText" not in v]
+        total = _insert_bill_versions(
+            db, pa.Table.from_pylist(with_text, schema=schema)
+        )
+        if without_text:
+            schema = schema.remove(schema.get_field_index("BillVersionFullText"))
+            without_text = pa.Table.from_pylist(without_text, schema=schema)
+            total += _insert_bill_versions(db, without_text)
+        return total
+    new = ibis.memtable(versions)
     logger.info(f"Ingesting {new.count().execute()} bill versions")
-
-    new = new.anti_join(db.BillVersion, "BillVersionId")
-    new = new.cache()
-    n_new = new.count().execute()
-    # logger.info(f"Found {n_existing} existing bill versions")
-    logger.info(f"Found {n_new} new bill versions")
-    if n_new > 0:
-        logger.info(f"Adding {n_new} new bill versions")
-        db.insert("billVersions", new)
-    return new.execute().to_dict(orient="records")
+    _db.check_references(db, {"billVersions": new})
+    changes = _db.upsert(db, "billVersions", new, key="BillVersionId")
+    logger.info(f"Bill versions: {changes}")
+    return changes
 
 
 def _scrape_missing_legislatures_and_sessions(
@@ -333,53 +686,286 @@ def _scrape_missing_legislatures_and_sessions(
 
 def _scrape_missing_bills(*, existing_bills: _db.BillTable) -> ibis.Table:
     """Scrape the bills for the legislatures that are missing bills."""
-    missing_leg_nums = _missing_leg_nums(
+    return asyncio.run(_scrape_missing_bills_async(existing_bills=existing_bills))
+
+
+async def _scrape_missing_bills_async(*, existing_bills: _db.BillTable) -> ibis.Table:
+    missing_leg_nums = await _in_db(
+        _missing_leg_nums,
         # the API doesn't have any data from the 11th legislature and before
         min_leg_num=12,
         existing_leg_nums=existing_bills.LegislatureNumber,
     )
     logger.info(f"Scraping missing bills for {missing_leg_nums}")
-    bill_dicts = _scrape.scrape_bills(legislature_numbers=missing_leg_nums)
+    bill_dicts = await _scrape.scrape_bills_async(legislature_numbers=missing_leg_nums)
     if not bill_dicts:
         # workaround for https://github.com/ibis-project/ibis/issues/10940
         bills = existing_bills.limit(0)
     else:
-        bills = ibis.memtable(bill_dicts)
-        bills = _parse.clean_bills(bills)
+        # clean_bills runs queries, so keep it off the event loop too.
+        bills = await _in_db(_parse.clean_bills, ibis.memtable(bill_dicts))
     return bills
 
 
-def _votes_to_scrape(db: _db.Backend) -> list[tuple[int, str]]:
-    """Determine which LegNum, MemberCode pairs might be missing from the database."""
-    missing_leg_nums = _missing_leg_nums(
-        # the API doesn't have any data from the 18th legislature and before,
-        min_leg_num=19,
-        existing_leg_nums=db.Vote.LegislatureNumber,
+def _votes_to_scrape(
+    db: _db.Backend, *, quiet_chambers: Collection[tuple[int, str]] = ()
+) -> dict[tuple[int, str], int | None]:
+    """Determine which LegNum, MemberCode pairs might be missing from the database.
+
+    This is one query. A member is skipped if their votes are already all present:
+    they have a choice on every vote in their chamber during their tenure,
+    ie from their first vote we have to their last.
+    Comparing with every vote in the chamber instead would never count
+    someone who joined or left partway through a legislature as complete.
+    Members of the latest legislature with votes (or any later one)
+    are always included, since new votes might have happened since,
+    unless their (LegislatureNumber, Chamber) is in `quiet_chambers`.
+
+    Returns {(LegislatureNumber, MemberCode): after}. If the member's votes
+    are complete, `after` is the highest VoteNumber they have a choice on,
+    so only their later votes are new. Otherwise it's None.
+    """
+    # the API doesn't have any data from the 18th legislature and before,
+    min_leg_num = 19
+    max_leg_num = _util.current_leg_num_approx()
+    votes = db.Vote.select("VoteId", "LegislatureNumber", "VoteChamber", "VoteNumber")
+    latest_with_votes = votes.LegislatureNumber.max()
+    chambers_with_votes = votes.select("LegislatureNumber", "VoteChamber").distinct()
+    tenures = (
+        db.Choice.select("VoteId", "MemberId")
+        .join(votes.select("VoteId", "VoteNumber"), "VoteId")
+        .group_by("MemberId")
+        .agg(
+            n_choices=_.count(),
+            first_vote=_.VoteNumber.min(),
+            last_vote=_.VoteNumber.max(),
+        )
+    )
+    members = db.Member.filter(
+        db.Member.LegislatureNumber.between(min_leg_num, max_leg_num),
+        db.Member.MemberCode.notnull(),
+    ).select("MemberId", "LegislatureNumber", "Chamber", "MemberCode")
+    with_tenures = members.join(tenures, "MemberId")
+    member_votes = with_tenures.join(
+        votes,
+        [
+            with_tenures.LegislatureNumber == votes.LegislatureNumber,
+            with_tenures.Chamber == votes.VoteChamber,
+            votes.VoteNumber.between(with_tenures.first_vote, with_tenures.last_vote),
+        ],
+    )
+    stats = member_votes.group_by("MemberId", "n_choices", "last_vote").agg(
+        n_votes_in_tenure=_.count()
+    )
+    joined = members.left_join(
+        chambers_with_votes,
+        [
+            members.LegislatureNumber == chambers_with_votes.LegislatureNumber,
+            members.Chamber == chambers_with_votes.VoteChamber,
+        ],
+    ).left_join(stats, "MemberId")
+    complete = _.n_choices.notnull() & (_.n_choices >= _.n_votes_in_tenure.fill_null(0))
+    is_quiet = ibis.or_(
+        ibis.literal(False),
+        *(
+            (_.LegislatureNumber == leg_num) & (_.Chamber == chamber)
+            for leg_num, chamber in quiet_chambers
+        ),
+    )
+    plan = (
+        joined.filter(
+            ibis.or_(
+                latest_with_votes.isnull(),
+                _.VoteChamber.isnull(),
+                ~complete,
+                (_.LegislatureNumber >= latest_with_votes) & ~is_quiet,
+            )
+        )
+        .select(
+            "LegislatureNumber",
+            "MemberCode",
+            after=ibis.ifelse(complete, _.last_vote, None),
+        )
+        .distinct()
+        # Newest first, in case we run out of time.
+        .order_by(ibis.desc("LegislatureNumber"), "MemberCode")
+    )
+    results = {
+        (row["LegislatureNumber"], row["MemberCode"]): row["after"]
+        for row in plan.to_pyarrow().to_pylist()
+    }
+    logger.info(
+        f"Planned to scrape votes for {len(results)} members, "
+        f"{sum(a is not None for a in results.values())} of them only for new votes"
     )
-    results = []
-    for leg_num in missing_leg_nums:
-        member_codes = db.Member.filter(
-            db.Member.LegislatureNumber == leg_num
-        ).MemberCode
-        results.extend((leg_num, code) for code in member_codes.execute())
     return results
 
 
+async def _quiet_chambers(db: _db.Backend) -> list[tuple[int, str]]:
+    """The (LegislatureNumber, Chamber)s that can't have voted since our latest vote.
+
+    For each chamber of the latest legislature with votes,
+    ask BASIS if that chamber has a journal for any day after its latest vote.
+    """
+
+    def latest_votes() -> list[dict]:
+        votes = db.Vote
+        return (
+            votes.filter(votes.LegislatureNumber == votes.LegislatureNumber.max())
+            .group_by("LegislatureNumber", "VoteChamber")
+            .agg(latest=_.VoteDate.max())
+            .filter(_.latest.notnull())
+            .to_pyarrow()
+            .to_pylist()
+        )
+
+    rows = await _in_db(latest_votes)
+
+    async def check(row: dict) -> bool | None:
+        since = row["latest"] + datetime.timedelta(days=1)
+        return await _scrape.has_journals_since(
+            row["LegislatureNumber"], row["VoteChamber"], since
+        )
+
+    has_journals = await asyncio.gather(*(check(row) for row in rows))
+    quiet = [
+        (row["LegislatureNumber"], row["VoteChamber"])
+        for row, has in zip(rows, has_journals)
+        if has is False
+    ]
+    logger.info(f"No floor sessions since our latest votes in {quiet}")
+    return quiet
+
+
 def _scrape_missing_votes_and_choices(
-    db: _db.Backend, *, votes_to_scrape: list[tuple[int, str]] | None = None
-) -> ibis.Table:
+    db: _db.Backend,
+    *,
+    votes_to_scrape: list[tuple[int, str]] | None = None,
+    spool: _spool.Spool | None = None,
+    incremental: bool = True,
+) -> tuple[ibis.Table, ibis.Table]:
+    return asyncio.run(
+        _scrape_missing_votes_and_choices_async(
+            db, votes_to_scrape=votes_to_scrape, spool=spool, incremental=incremental
+        )
+    )
+
+
+async def _scrape_missing_votes_and_choices_async(
+    db: _db.Backend,
+    *,
+    votes_to_scrape: list[tuple[int, str]] | None = None,
+    spool: _spool.Spool | None = None,
+    incremental: bool = True,
+) -> tuple[ibis.Table, ibis.Table]:
+    """Scrape the votes we don't have yet.
+
+    If `incremental`, chambers that haven't had a floor session since
+    our latest vote are skipped, and for members whose votes are otherwise
+    complete, only the votes numbered after our latest one are kept.
+    Then the nightly scrape scales with the day's floor activity,
+    not with the size of the legislature.
+    Otherwise every vote of every planned member is re-ingested,
+    which also picks up corrections to old votes.
+    """
+    after_vote_numbers: dict[tuple[int, str], int] = {}
     if votes_to_scrape is None:
-        votes_to_scrape = _votes_to_scrape(db)
+        quiet = await _quiet_chambers(db) if incremental else []
+        plan = await _in_db(_votes_to_scrape, db, quiet_chambers=quiet)
+        votes_to_scrape = list(plan)
+        if incremental:
+            after_vote_numbers = {k: a for k, a in plan.items() if a is not None}
+    if spool is None:
+        spool = _vote_spool()
     logger.info(f"Scraping missing votes for {votes_to_scrape}")
-    dicts = _scrape.scrape_votes(leg_num_and_member_codes=votes_to_scrape)
-    choices = ibis.memtable(dicts)
-    choices = _parse.clean_choices(choices)
+    await _scrape.scrape_votes_to_spool_async(
+        leg_num_and_member_codes=votes_to_scrape,
+        spool=spool,
+        after_vote_numbers=after_vote_numbers,
+    )
+    return await _in_db(_split_vote_spool, db, spool)
+
+
+def _split_vote_spool(
+    db: _db.Backend, spool: _spool.Spool
+) -> tuple[ibis.Table, ibis.Table]:
+    """Read, clean, and split the spool into votes and choices, as in-memory tables.
+
+    This runs every query it needs before returning,
+    so it can run in a worker thread without the caller touching the database.
+    """
+    choices = _parse.clean_choices(_read_vote_spool(db, spool))
     votes, choices = _split_choices.split_choices(
         choices_raw=choices, bills=db.Bill, members=db.Member
     )
+    # avoid https://github.com/ibis-project/ibis/issues/10942
+    votes = ibis.memtable(votes.to_pyarrow(), schema=votes.schema())
+    choices = ibis.memtable(choices.to_pyarrow(), schema=choices.schema())
     return votes, choices
 
 
+def _vote_spool() -> _spool.Spool:
+    """The spool that scraped votes are saved to until they're inserted.
+
+    This only helps when an ingest is re-run on the same machine,
+    within the spool's `max_age`, after crashing partway through:
+    eg locally, or when a step is retried within one CI job.
+    It doesn't carry over between nightly CI runs, and isn't cached there:
+    a run that succeeds clears it, actions/cache only saves after a job
+    succeeds, and by the next night it would be too old to use anyway.
+    """
+    return _spool.Spool(_util.data_dir() / "vote-spool")
+
+
+_RAW_VOTE_SCHEMA = ibis.schema(
+    {
+        "LegislatureNumber": "int16",
+        "VoteNum": "string",
+        "VoteDate": "string",
+        "Title": "string",
+        "Bill": "string",
+        "Member": "string",
+        "Vote": "string",
+    }
+)
+
+
+def _read_vote_spool(db: _db.Backend, spool: _spool.Spool) -> ibis.Table:
+    """Read the raw vote records from the spool, without loading them into python.
+
+    The spool has a header record (with no Member) per roll call,
+    and a record per member's vote, see `_scrape._compact_votes`.
+    These are joined back into one record per vote, like BASIS returns them.
+    """
+    if spool.is_empty():
+        return ibis.memtable({c: [] for c in _RAW_VOTE_SCHEMA}, schema=_RAW_VOTE_SCHEMA)
+    # Read with explicit column types, so that eg VoteDate is left as a string
+    # for clean_choices to deal with, instead of being sniffed as a date.
+    records = db.read_json(
+        spool.records_path,
+        format="newline_delimited",
+        columns={c: DuckDBType.to_string(t) for c, t in _RAW_VOTE_SCHEMA.items()},
+    )
+    headers = (
+        records.filter(_.Member.isnull())
+        .select("LegislatureNumber", "VoteNum", "VoteDate", "Title", "Bill")
+        .distinct()
+    )
+    votes = records.filter(_.Member.notnull())
+    joined = votes.left_join(headers, ["LegislatureNumber", "VoteNum"])
+    # Votes without a VoteNum (or from spools written before headers were split out)
+    # have their own VoteDate etc.
+    return joined.select(
+        "LegislatureNumber",
+        "VoteNum",
+        VoteDate=ibis.coalesce(votes.VoteDate, headers.VoteDate),
+        Title=ibis.coalesce(votes.Title, headers.Title),
+        Bill=ibis.coalesce(votes.Bill, headers.Bill),
+        Member=votes.Member,
+        Vote=votes.Vote,
+    )
+
+
 def _missing_leg_nums(
     *,
     min_leg_num: int,
@@ -395,6 +981,7 @@ def _missing_leg_nums(
     if len(existing_nums):
         latest = max(existing_nums)
         missing_nums.add(latest)
-    missing_nums_list = sorted(missing_nums)
+    # Newest first, in case we run out of time.
+    missing_nums_list = sorted(missing_nums, reverse=True)
     logger.info(f"Missing leg_nums: {missing_nums_list}")
     return missing_nums_list
@@ -1,15 +1,42 @@
+from __future__ import annotations
+
 import asyncio
+import collections
+import dataclasses
+import functools
+import itertools
 import json
 import logging
-from collections.abc import Iterable
+import os
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable, Iterable
 from typing import Literal, TypedDict
 
 import httpx
 
+from alaska_legislative_data import _http, _unavailable, _util
+
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://www.akleg.gov/publicservice/basis"
 
+# Responses like members+Votes are several MB, so use a fast JSON decoder
+# if one is installed. They all parse straight from bytes,
+# skipping the step of decoding the whole body to a str first.
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+    _JSON_DECODE_ERRORS: tuple[type[Exception], ...] = (orjson.JSONDecodeError,)
+except ImportError:
+    try:
+        import msgspec
+
+        _json_loads = msgspec.json.decode
+        _JSON_DECODE_ERRORS = (msgspec.DecodeError,)
+    except ImportError:
+        _json_loads = json.loads
+        _JSON_DECODE_ERRORS = (json.JSONDecodeError, UnicodeDecodeError)
+
 
 class DataUnimplementedError(ValueError):
     """Exception when you try to access data that is not implemented yet.
@@ -27,6 +54,13 @@ class ServerError(RuntimeError):
         super().__init__(f"Server error for {url} with headers {headers}: {response}")
 
 
+class KnownServerError(ServerError):
+    """A request that we didn't make, because it is known to always cause a ServerError.
+
+    See `_unavailable.UnavailableRegistry`.
+    """
+
+
 class SponsoringMember(TypedDict):
     # {"Code":"BUR",
     # "UID":0,"LastName":"Burke",
@@ -233,55 +267,154 @@ async def session(
     session: int | None = None,
     chamber: Literal["H", "S"] | None = None,
     range: slice | tuple[int | None, int | None] | None = None,
+    ttl: float | None = None,
 ) -> dict:
-    """This doesn't follow the pattern and returns a single session."""
+    """This doesn't follow the pattern and returns a single session.
+
+    `ttl` is how old a cached response may be, see `_http.fetch()`.
+    """
     result = await _make_request(
         "sessions",
         queries=queries,
         session=session,
         chamber=chamber,
         range=range,
+        ttl=ttl,
     )
     return result["Session"]  # It is NOT "Sessions"
 
 
-rate_semaphore = asyncio.Semaphore(5)
-
+async def count(
+    endpoint: str,
+    *,
+    queries: Iterable[str] | str | None = None,
+    session: int | None = None,
+    chamber: Literal["H", "S"] | None = None,
+) -> int | None:
+    """How many results a request would return, without fetching them.
 
-def get_client() -> httpx.AsyncClient:
-    """Get a system-wide client for the Alaska Legislature API.
+    Like the `count()` methods in the JS library, this makes a HEAD request
+    and reads the `X-Alaska-Query-Count` header.
+    Returns None if the server didn't send that header.
+    """
+    url, headers = _build_request(
+        endpoint, queries=queries, session=session, chamber=chamber
+    )
 
-    By being system-wide, we can impose limits on the number of concurrent connections"""
-    timeout = httpx.Timeout(30.0, pool=30.0)
-    limits = httpx.Limits(max_keepalive_connections=None, max_connections=5)
-    return httpx.AsyncClient(
-        timeout=timeout,
-        limits=limits,
-        follow_redirects=True,
+    async def head() -> httpx.Response:
+        async with (
+            _http.client_pool() as pool,
+            pool.limiter.slot(overload_errors=(ServerError,)),
+        ):
+            response = await pool.request("HEAD", url, headers=headers)
+            response.raise_for_status()
+        return response
+
+    response = await _http.with_retries(
+        head, max_retries=3, exception_classes=(httpx.HTTPError,)
     )
+    n = response.headers.get("X-Alaska-Query-Count")
+    if n is None:
+        logger.warning(f"No X-Alaska-Query-Count for {url} with headers {headers}")
+        return None
+    return int(n)
 
 
-async def _make_request(
+async def paginate(
+    endpoint: str,
+    key: str,
+    *,
+    queries: Iterable[str] | str | None = None,
+    session: int | None = None,
+    chamber: Literal["H", "S"] | None = None,
+    page_size: int = 100,
+    max_concurrent_pages: int = 3,
+) -> AsyncIterator[list[dict]]:
+    """Fetch every result of a request in pages, for responses that are too big otherwise.
+
+    First we `count()` the results, then fetch windows of `page_size` results
+    using the `X-Alaska-Query-ResultRange` header, a few at a time,
+    yielding the pages in order as they arrive.
+    If we can't count them, the pages are fetched one after another instead,
+    until one comes back short.
+
+    Parameters
+    ----------
+    endpoint:
+        eg "bills"
+    key:
+        The key of the results in the response, eg "Bills"
+    """
+    if queries is not None and not isinstance(queries, str):
+        # We reuse these for every page, so they can't be a one-shot iterator.
+        queries = tuple(queries)
+    try:
+        n = await count(endpoint, queries=queries, session=session, chamber=chamber)
+    # RuntimeError once every retry failed, ValueError for a garbled count.
+    except (RuntimeError, ValueError) as e:
+        logger.warning(f"Couldn't count {endpoint} for session {session}: {e!r}")
+        n = None
+    if n is None:
+        start = 1
+        while True:
+            resp = await _make_request(
+                endpoint,
+                queries=queries,
+                session=session,
+                chamber=chamber,
+                range=slice(start, start + page_size - 1),
+            )
+            page = resp[key]
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            start += page_size
+
+    async def fetch_page(start: int) -> list[dict]:
+        # Ranges are 1-based and inclusive, eg "10" is the same as "1..10"
+        stop = min(start + page_size - 1, n)
+        resp = await _make_request(
+            endpoint,
+            queries=queries,
+            session=session,
+            chamber=chamber,
+            range=slice(start, stop),
+        )
+        return resp[key]
+
+    starts = iter(range(1, n + 1, page_size))
+    pending: collections.deque[asyncio.Task] = collections.deque(
+        asyncio.create_task(fetch_page(start))
+        for start in itertools.islice(starts, max_concurrent_pages)
+    )
+    try:
+        while pending:
+            page = await pending.popleft()
+            next_start = next(starts, None)
+            if next_start is not None:
+                pending.append(asyncio.create_task(fetch_page(next_start)))
+            yield page
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _build_request(
     endpoint: str,
     *,
     queries: Iterable[str] | str | None = None,
     session: int | None = None,
     chamber: Literal["H", "S"] | None = None,
     range: slice | tuple[int | None, int | None] | None = None,
-    client: httpx.AsyncClient | None = None,
-) -> dict:
-    if client is None:
-        client = get_client()
-    url = f"https://www.akleg.gov/publicservice/basis/{endpoint}?minifyresult=false&json=true"
+) -> tuple[str, dict[str, str]]:
+    url = f"{BASE_URL}/{endpoint}?minifyresult=false&json=true"
     if session is not None:
         url += f"&session={session}"
     if chamber is not None:
         url += f"&chamber={chamber}"
 
-    if queries is None:
-        queries = ()
-    if isinstance(queries, str):
-        queries = (queries,)
+    queries = _query_list(queries)
     headers = {
         "user-agent": "Mozilla/5.0",
         "X-Alaska-Legislature-Basis-Version": "1.4",
@@ -291,60 +424,251 @@ async def _make_request(
         headers["X-Alaska-Legislature-Basis-Query"] = ",".join(queries)
     if range:
         headers["X-Alaska-Query-ResultRange"] = _range_str(range)
-    logger.debug(f"Requesting {url} with headers {headers}")
+    return url, headers
 
-    async with client:
 
-        async def f():
-            async with rate_semaphore:
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
-                return _parse(url, headers, response.text)
+@dataclasses.dataclass
+class _Flight:
+    task: asyncio.Future[dict]
+    n_waiters: int = 0
 
-        try:
-            return await _with_retries(
-                f,
-                max_retries=3,
-                # Sometimes the request fails with a ServerError but can succeed on retry
-                exception_classes=(httpx.HTTPError, ServerError),
+
+class RequestMemo:
+    """Shares the parsed results of identical requests.
+
+    Concurrent identical requests (same endpoint, session, chamber, queries,
+    and range) are coalesced into one, whose result they all get.
+    If `maxsize` is more than 0, the results of the `maxsize` most recent
+    successful requests are also kept in memory, and returned for repeats.
+    Since results are shared, callers must not mutate them.
+
+    Parameters
+    ----------
+    maxsize:
+        How many results to keep. Some responses, like members+Votes,
+        are several MB, so this is off (0) by default.
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self.maxsize = maxsize
+        self.n_hits = 0
+        """Requests answered from the kept results."""
+        self.n_coalesced = 0
+        """Requests that joined an identical request already in flight."""
+        self.n_misses = 0
+        """Requests that were actually made."""
+        self._results: collections.OrderedDict[Hashable, dict] = (
+            collections.OrderedDict()
+        )
+        self._in_flight: dict[Hashable, _Flight] = {}
+
+    @classmethod
+    def from_env(cls) -> RequestMemo:
+        """A memo keeping `$AK_LEG_MEMO_SIZE` results, or none if that isn't set."""
+        return cls(maxsize=int(os.environ.get("AK_LEG_MEMO_SIZE") or 0))
+
+    def __repr__(self) -> str:
+        return (
+            f"RequestMemo(maxsize={self.maxsize}, hits={self.n_hits}, "
+            f"coalesced={self.n_coalesced}, misses={self.n_misses})"
+        )
+
+    def clear(self) -> None:
+        """Forget the kept results."""
+        self._results.clear()
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[dict]]) -> dict:
+        """The result of `fetch()`, shared with every other request for `key`."""
+        if key in self._results:
+            self.n_hits += 1
+            self._results.move_to_end(key)
+            return self._results[key]
+        # Futures belong to one event loop, eg one `asyncio.run()`.
+        flight_key = (asyncio.get_running_loop(), key)
+        flight = self._in_flight.get(flight_key)
+        if flight is None:
+            self.n_misses += 1
+            flight = _Flight(asyncio.ensure_future(fetch()))
+            self._in_flight[flight_key] = flight
+            flight.task.add_done_callback(
+                functools.partial(self._finish, flight_key, key)
             )
-        except DataUnimplementedError:
-            raise
-        except ServerError:
-            raise
-        except Exception as e:
-            logger.error(f"Failed to get {url} with headers {headers}: {e!r}")
+        else:
+            self.n_coalesced += 1
+        flight.n_waiters += 1
+        try:
+            # Shielded, so one caller being cancelled doesn't cancel the others.
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.n_waiters == 1:
+                flight.task.cancel()
             raise
+        finally:
+            flight.n_waiters -= 1
+
+    def _finish(
+        self, flight_key: Hashable, key: Hashable, task: asyncio.Future[dict]
+    ) -> None:
+        del self._in_flight[flight_key]
+        if self.maxsize <= 0 or task.cancelled() or task.exception() is not None:
+            return
+        self._results[key] = task.result()
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+
+@functools.cache
+def default_memo() -> RequestMemo:
+    """The memo shared by every request, see `RequestMemo.from_env`.
+
+    eg in a notebook, `_low.default_memo().maxsize = 100`
+    makes re-running a cell that calls `await _low.members(session=34)` free.
+    """
+    return RequestMemo.from_env()
 
 
-async def _with_retries(f, *, max_retries: int, exception_classes=(Exception,)):
-    for i in range(max_retries):
-        try:
-            return await f()
-        except exception_classes as e:
-            logger.warning(f"Retrying {i + 1}/{max_retries} after error: {e!r}")
-            if i == max_retries - 1:
-                raise RuntimeError(f"Failed {max_retries} times") from e
-            else:
-                # exponential backoff
-                # 0.5, 1, 2, 4, 8
-                await asyncio.sleep(0.5 * 2**i)
-
-
-def _parse(url: str, headers: dict, raw: str) -> dict:
+async def _make_request(
+    endpoint: str,
+    *,
+    queries: Iterable[str] | str | None = None,
+    session: int | None = None,
+    chamber: Literal["H", "S"] | None = None,
+    range: slice | tuple[int | None, int | None] | None = None,
+    ttl: float | None = None,
+) -> dict:
+    if queries is not None and not isinstance(queries, str):
+        # We need them twice, so they can't be a one-shot iterator.
+        queries = tuple(queries)
+    if ttl is not None:
+        # The caller wants something fresher than the memo might have.
+        return await _request(
+            endpoint,
+            queries=queries,
+            session=session,
+            chamber=chamber,
+            range=range,
+            ttl=ttl,
+        )
+    key = (
+        endpoint,
+        session,
+        chamber,
+        tuple(_query_list(queries)),
+        _range_str(range) if range else None,
+    )
+    return await default_memo().get(
+        key,
+        functools.partial(
+            _request,
+            endpoint,
+            queries=queries,
+            session=session,
+            chamber=chamber,
+            range=range,
+        ),
+    )
+
+
+async def _request(
+    endpoint: str,
+    *,
+    queries: Iterable[str] | str | None = None,
+    session: int | None = None,
+    chamber: Literal["H", "S"] | None = None,
+    range: slice | tuple[int | None, int | None] | None = None,
+    ttl: float | None = None,
+) -> dict:
+    url, headers = _build_request(
+        endpoint, queries=queries, session=session, chamber=chamber, range=range
+    )
+    logger.debug(f"Requesting {url} with headers {headers}")
+
+    # Paged requests are only a slice of some bigger request, so don't track them.
+    # Nor requests about the current legislature (the default if there's
+    # no session), where a failure now doesn't mean it will keep failing.
+    registry = None
+    if (
+        range is None
+        and session is not None
+        and session < _util.current_leg_num_approx()
+    ):
+        registry = _unavailable.default_registry()
+    registry_key = {
+        "session": session,
+        "chamber": chamber,
+        "queries": _query_list(queries),
+    }
+    if registry is not None:
+        known_failure = registry.lookup(endpoint, **registry_key)
+        if known_failure == "unimplemented":
+            raise DataUnimplementedError(
+                f"Skipping {url} with headers {headers}, it is known to be unavailable"
+            )
+        if known_failure == "server_error":
+            raise KnownServerError(
+                "Skipped, this is known to always fail", url, headers
+            )
+
+    async def f():
+        return await _http.fetch(
+            url,
+            headers=headers,
+            parse=functools.partial(_parse, url, headers),
+            overload_errors=(ServerError,),
+            ttl=ttl,
+        )
+
     try:
-        d = json.loads(raw)
-    except json.JSONDecodeError as e:
-        if "Invalid Session Number" in raw:
+        result = await _http.with_retries(
+            f,
+            max_retries=3,
+            # Sometimes the request fails with a ServerError but can succeed on retry
+            exception_classes=(httpx.HTTPError, ServerError),
+        )
+    except DataUnimplementedError:
+        if registry is not None:
+            registry.record(endpoint, **registry_key, kind="unimplemented")
+        raise
+    except ServerError:
+        raise
+    except RuntimeError as e:
+        # with_retries() gave up, the last error is the cause.
+        logger.error(f"Failed to get {url} with headers {headers}: {e!r}")
+        if isinstance(e.__cause__, ServerError):
+            # It failed every retry, so it is probably going to keep failing.
+            if registry is not None:
+                registry.record(endpoint, **registry_key, kind="server_error")
+            raise ServerError(str(e), url, headers) from e
+        raise
+    if registry is not None:
+        registry.clear(endpoint, **registry_key)
+    return result
+
+
+def _parse(url: str, headers: dict, raw: bytes) -> dict:
+    try:
+        d = _json_loads(raw)
+    except _JSON_DECODE_ERRORS as e:
+        # Only now, on the error path, do we need the body as text.
+        text = raw.decode("utf-8", errors="replace")
+        if "Invalid Session Number" in text:
             raise DataUnimplementedError(str(e)) from e
-        if "<Code>FaultException</Code>" in raw:
-            raise ServerError(raw, url, headers) from e
-        if "<Code>XmlSchemaValidationException</Code>" in raw:
-            raise ServerError(raw, url, headers) from e
-        raise ValueError(f"Invalid JSON: {raw}") from e
+        if "<Code>FaultException</Code>" in text:
+            raise ServerError(text, url, headers) from e
+        if "<Code>XmlSchemaValidationException</Code>" in text:
+            raise ServerError(text, url, headers) from e
+        raise ValueError(f"Invalid JSON: {text}") from e
     return d["Basis"]
 
 
+def _query_list(queries: Iterable[str] | str | None) -> list[str]:
+    if queries is None:
+        return []
+    if isinstance(queries, str):
+        return [queries]
+    return list(queries)
+
+
 def _range_str(range: slice | tuple[int | None, int | None]) -> str:
     if not isinstance(range, (slice, tuple)):
         raise ValueError("Invalid range: {range}")
@@ -1,5 +1,3 @@
-import datetime
-
 import ibis
 from ibis import _
 from ibis.expr import types as ir
@@ -64,6 +62,7 @@ def clean_bills(t: ibis.Table) -> ibis.Table:
         BillManifestErrors=_.ManifestErrors,
         BillStatutes=_.Statutes,
         BillCurrentCommittee=_.CurrentCommittee,
+        BillActions=_.Actions,
     )
     t = t.mutate(
         # using session number and personId is inadequate, as there are some
@@ -96,6 +95,7 @@ def clean_bills(t: ibis.Table) -> ibis.Table:
         "BillManifestErrors": "array<json>",
         "BillStatutes": "array<json>",
         "BillCurrentCommittee": "struct<Chamber: string, Code: string, Catagory: string, Name: string, MeetingDays: string, Location: string, StartTime: string, EndTime: string, Email: string>",
+        "BillActions": "array<json>",
     }
     assert set(t.columns) == set(t.schema().keys())
     t = t.cast(schema)
@@ -113,18 +113,12 @@ def clean_and_split_legislatures_into_sessions(
 ) -> tuple[_db.LegislatureTable, _db.LegislatureSessionTable]:
     t = _fix_strings(t)
 
-    @ibis.udf.scalar.python(signature=(("string",), "date"))
-    def parse_date(s: str) -> datetime.date:
-        # "/Date(726742800000)/" to date
-        n_millis = int(s[6:-2])
-        return datetime.date.fromtimestamp(n_millis / 1000)
-
     def expand_session(sd: ir.StructValue) -> dict:
         return {
             "LegislatureSessionCode": sd.ID,
             "LegislatureSessionTitle": sd.Title,
-            "LegislatureSessionStartDate": parse_date(sd.StartDate),
-            "LegislatureSessionEndDate": parse_date(sd.EndDate),
+            "LegislatureSessionStartDate": _parse_epoch_date(sd.StartDate),
+            "LegislatureSessionEndDate": _parse_epoch_date(sd.EndDate),
         }
 
     sessions = t.select(
@@ -156,7 +150,7 @@ def clean_and_split_legislatures_into_sessions(
 def _fix_strings(t: ibis.Table) -> ibis.Table:
     """Strip whitespace from all string columns in the table."""
     string_cols = [c for c in t.schema() if t.schema()[c].is_string()]
-    return t.mutate({c: _fix_string(c) for c in string_cols})
+    return t.mutate({c: _fix_string(t[c]) for c in string_cols})
 
 
 def _fix_string(s: ir.StringValue) -> ir.StringValue:
@@ -198,6 +192,14 @@ def _parse_StatusDate(s: ir.StringValue) -> ir.DateValue:
     return s.try_cast("date")
 
 
+def _parse_epoch_date(s: ir.StringValue) -> ir.DateValue:
+    # eg "/Date(726742800000)/", in milliseconds since the epoch, to 1993-01-11.
+    # EPOCH_MS gives a naive UTC timestamp, so this doesn't depend on the time zone
+    # of the machine, unlike datetime.date.fromtimestamp().
+    n_millis = s.re_extract(r"^/Date\((-?\d+)\)/$", 1).nullif("").cast("int64")
+    return n_millis.as_timestamp("ms").date()
+
+
 def _parse_amendment_numbers(vote_title: ibis.ir.StringValue) -> ibis.ir.DecimalValue:
     # returning as a decimal means that sorting works, and we can split
     # on "." to get the root and sub-amendment numbers.
@@ -212,21 +214,3 @@ def _parse_amendment_numbers(vote_title: ibis.ir.StringValue) -> ibis.ir.Decimal
     )
     sub = sub.fill_null(implicit_sub1)
     return (root + "." + sub).cast("decimal(9, 1)")
-
-
-def _test_parse_amendment_numbers(inp, exp):
-    res = _parse_amendment_numbers(ibis.literal(inp, type="string")).execute()
-    # convert nan to None
-    if res != res:
-        res = None
-    if res is not None:
-        res = float(res)
-    assert res == exp, (exp, res)
-
-
-_test_parse_amendment_numbers("foo", None)
-_test_parse_amendment_numbers("Amendment No. 1", 1.0)
-_test_parse_amendment_numbers("Amendment No. 2", 2.0)
-_test_parse_amendment_numbers("Amendment No. 1 to Amendment No. 3", 3.1)
-_test_parse_amendment_numbers("Amendment No. 2 to Amendment No. 3", 3.2)
-_test_parse_amendment_numbers("Amendment to Amendment No. 3", 3.1)
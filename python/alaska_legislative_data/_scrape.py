@@ -1,33 +1,69 @@
 import asyncio
+import contextlib
+import contextvars
 import datetime
 import logging
 import re
-from typing import TypedDict
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from typing import NotRequired, TypedDict, TypeVar
 
-from alaska_legislative_data import _bill_version_text, _low, _util
+from alaska_legislative_data import _bill_version_text, _http, _low, _spool, _util
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 logger = logging.getLogger(__name__)
 
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "alaska_legislative_data_deadline", default=None
+)
+
+
+@contextlib.contextmanager
+def deadline(at: float | None) -> Iterator[None]:
+    """Within this, stop starting new scrapes once `time.monotonic()` passes `at`.
+
+    Scrapes already in flight are finished, and their results returned as usual,
+    so they can be saved. What wasn't started is logged as deferred.
+    If `at` is None, there is no deadline.
+    """
+    token = _deadline.set(at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def past_deadline() -> bool:
+    """Whether we're past the current `deadline`, so shouldn't start new scrapes."""
+    at = _deadline.get()
+    return at is not None and time.monotonic() >= at
+
 
 class BillSpec(TypedDict):
     LegislatureNumber: int
     BillNumber: str
+    VersionLetters: NotRequired[list[str]]
+    """Only scrape these versions of the bill. If not given, scrape all of them."""
 
 
 def scrape_legislatures_and_sessions(
     legislature_numbers: list[int] | None = None,
+) -> list[dict]:
+    return asyncio.run(scrape_legislatures_and_sessions_async(legislature_numbers))
+
+
+async def scrape_legislatures_and_sessions_async(
+    legislature_numbers: list[int] | None = None,
 ) -> list[dict]:
     if legislature_numbers is None:
         legislature_numbers = _gen_leg_numbers()
-
-    async def main() -> list[dict]:
+    async with _http.client_pool():
         tasks = [_do_scrape_leg(n) for n in legislature_numbers]
         sessions = await asyncio.gather(*tasks)
-        sessions = [s for s in sessions if s is not None]
-        return sessions
-
-    leg_and_sessions = asyncio.run(main())
-    return leg_and_sessions
+    sessions = [s for s in sessions if s is not None]
+    return sessions
 
 
 def _gen_leg_numbers() -> list[int]:
@@ -58,14 +94,17 @@ async def _do_scrape_leg(leg_num: int) -> dict | None:
 
 
 def scrape_members(legislature_numbers: list[int] | None = None) -> list[dict]:
+    return asyncio.run(scrape_members_async(legislature_numbers))
+
+
+async def scrape_members_async(
+    legislature_numbers: list[int] | None = None,
+) -> list[dict]:
     if legislature_numbers is None:
         legislature_numbers = _gen_leg_numbers()
-
-    async def main():
+    async with _http.client_pool():
         tasks = [_scrape_members_of_leg(n) for n in legislature_numbers]
-        return await asyncio.gather(*tasks)
-
-    results = asyncio.run(main())
+        results = await asyncio.gather(*tasks)
     results = [r for r in results if r is not None]
     flattened = []
     for r in results:
@@ -77,22 +116,73 @@ async def _scrape_members_of_leg(legislature_number: int) -> list[dict] | None:
     try:
         m = await _low.members(session=legislature_number)
     except _low.DataUnimplementedError:
-        # TODO: do something so we don't continually try re-scraping
         return None
     return [{**member, "LegislatureNumber": legislature_number} for member in m]
 
 
 def scrape_bills(
     legislature_numbers: list[int] | None = None,
+) -> list[dict]:
+    return asyncio.run(scrape_bills_async(legislature_numbers))
+
+
+async def scrape_bills_async(
+    legislature_numbers: list[int] | None = None,
 ) -> list[dict]:
     if legislature_numbers is None:
         legislature_numbers = _gen_leg_numbers()
+    async with _http.client_pool():
+        tasks = [_scrape_bills_before_deadline(n) for n in legislature_numbers]
+        results = await asyncio.gather(*tasks)
+    results = [r for r in results if r is not None]
+    flattened = []
+    for r in results:
+        flattened.extend(r)
+    return flattened
 
-    async def main():
-        tasks = [scrape_bills_of_legislature(n) for n in legislature_numbers]
-        return await asyncio.gather(*tasks)
 
-    results = asyncio.run(main())
+async def _scrape_bills_before_deadline(legislature_number: int) -> list[dict] | None:
+    # A legislature's bills are scraped all or nothing, since a legislature
+    # with some bills in the database isn't considered missing any more.
+    if past_deadline():
+        logger.warning(f"Past the deadline, deferred the bills of {legislature_number}")
+        return None
+    return await scrape_bills_of_legislature(legislature_number)
+
+
+async def scrape_bills_of_legislature(legislature_number: int) -> list[dict] | None:
+    # With "Actions", the response for a whole legislature is too large,
+    # so fetch it in pages.
+    b = []
+    try:
+        async for page in _low.paginate(
+            "bills",
+            "Bills",
+            queries=["Subjects", "Actions"],
+            session=legislature_number,
+        ):
+            b.extend(page)
+    except _low.DataUnimplementedError:
+        return None
+    bills = [{**bill, "LegislatureNumber": legislature_number} for bill in b]
+    return bills
+
+
+def scrape_bill_version_listings(legislature_numbers: list[int]) -> list[dict]:
+    """Scrape every bill of some legislatures, with the metadata of their versions.
+
+    This doesn't include the text of the versions, so it is cheap:
+    one request per legislature.
+    """
+    return asyncio.run(scrape_bill_version_listings_async(legislature_numbers))
+
+
+async def scrape_bill_version_listings_async(
+    legislature_numbers: list[int],
+) -> list[dict]:
+    async with _http.client_pool():
+        tasks = [_scrape_bill_version_listing(n) for n in legislature_numbers]
+        results = await asyncio.gather(*tasks)
     results = [r for r in results if r is not None]
     flattened = []
     for r in results:
@@ -100,20 +190,15 @@ def scrape_bills(
     return flattened
 
 
-async def scrape_bills_of_legislature(legislature_number: int) -> list[dict] | None:
+async def _scrape_bill_version_listing(legislature_number: int) -> list[dict] | None:
     try:
         b = await _low.bills(
-            queries=[
-                "Subjects",
-                # "Actions",  # this makes each response too large
-            ],
+            queries=["versions;fulltext=urlonly"],
             session=legislature_number,
         )
     except _low.DataUnimplementedError:
-        # TODO: do something so we don't continually try re-scraping
         return None
-    bills = [{**bill, "LegislatureNumber": legislature_number} for bill in b]
-    return bills
+    return [{**bill, "LegislatureNumber": legislature_number} for bill in b]
 
 
 async def scrape_bill_details(
@@ -134,41 +219,395 @@ async def scrape_bill_details(
             "LegislatureNumber": legislature_number,
         }
     except _low.DataUnimplementedError:
-        # TODO: do something so we don't continually try re-scraping
         return None
 
 
-async def scrape_bill_versions(leg_num: int, bill_number: str) -> list[dict]:
-    """Scrape the versions of a bill."""
+async def scrape_bill_versions(
+    leg_num: int, bill_number: str, version_letters: list[str] | None = None
+) -> list[dict]:
+    """Scrape the versions of a bill.
+
+    If `version_letters` is given, only fetch the text of those versions.
+    """
     raw_bill = await scrape_bill_details(
         legislature_number=leg_num, bill_number=bill_number
     )
     if raw_bill is None:
         logger.warning(f"Failed to scrape bill {leg_num}:{bill_number}")
         return []
-    versions = await _prep_bill_versions(leg_num, raw_bill)
+    versions = await _prep_bill_versions(leg_num, raw_bill, version_letters)
     return versions
 
 
+async def scrape_bill_versions_of_legislature(
+    leg_num: int, bills: list[BillSpec], *, min_batch_size: int = 20
+) -> list[dict]:
+    """Scrape the versions of many bills in one legislature.
+
+    See `stream_bill_versions`.
+    """
+    results = []
+    async for versions in stream_bill_versions(
+        [{**spec, "LegislatureNumber": leg_num} for spec in bills],
+        min_batch_size=min_batch_size,
+    ):
+        results.extend(versions)
+    return results
+
+
+async def stream_bill_versions(
+    bills: list[BillSpec],
+    *,
+    min_batch_size: int = 20,
+    max_workers: int = 20,
+    details: dict[int, dict[str, _low.Bill]] | None = None,
+) -> AsyncIterator[list[dict]]:
+    """Yield the versions of each bill, as soon as that bill's are scraped.
+
+    For each legislature with at least `min_batch_size` bills,
+    their details are fetched up front with a few bulk requests
+    (see `scrape_bill_details_batch`) instead of one request per bill.
+    Then `max_workers` workers fetch the text of the versions, one bill at a time,
+    so at most about `max_workers` bills' versions are held in memory at once.
+
+    `details` are bills we already have, keyed by LegislatureNumber and then
+    like `scrape_bill_details_batch`, eg from `scrape_bill_version_listings_async`.
+    Their legislatures aren't fetched again.
+    """
+    details = dict(details or {})
+    by_leg: dict[int, list[BillSpec]] = {}
+    for spec in bills:
+        by_leg.setdefault(spec["LegislatureNumber"], []).append(spec)
+    batched = [
+        leg
+        for leg, specs in by_leg.items()
+        if len(specs) >= min_batch_size and leg not in details and not past_deadline()
+    ]
+    batch_details = await asyncio.gather(
+        *(
+            scrape_bill_details_batch(leg, [s["BillNumber"] for s in by_leg[leg]])
+            for leg in batched
+        )
+    )
+    details.update(zip(batched, batch_details))
+
+    async def one_bill(spec: BillSpec) -> list[dict]:
+        leg_num = spec["LegislatureNumber"]
+        bill_number = spec["BillNumber"]
+        raw_bill = details.get(leg_num, {}).get(clean_bill_number(bill_number))
+        if raw_bill is None:
+            return await scrape_bill_versions(
+                leg_num, bill_number, spec.get("VersionLetters")
+            )
+        return await _prep_bill_versions(leg_num, raw_bill, spec.get("VersionLetters"))
+
+    async for _spec, versions in _map_unordered(one_bill, bills, max_workers):
+        yield versions
+
+
+async def scrape_bill_details_batch(
+    legislature_number: int, bill_numbers: list[str], *, page_size: int = 100
+) -> dict[str, _low.Bill]:
+    """Scrape the details of many bills at once, keyed by (cleaned) BillNumber.
+
+    This pages through every bill of the legislature with their versions and sponsors,
+    which is a handful of requests, instead of one request per bill.
+    If the bulk scrape fails partway through,
+    the bills we didn't get are fetched one at a time.
+    """
+    wanted = {clean_bill_number(b) for b in bill_numbers}
+    found: dict[str, _low.Bill] = {}
+    try:
+        async for page in _low.paginate(
+            "bills",
+            "Bills",
+            queries=["versions;fulltext=urlonly", "sponsors"],
+            session=legislature_number,
+            page_size=page_size,
+        ):
+            for bill in page:
+                bill_number = clean_bill_number(bill["BillNumber"])
+                if bill_number in wanted:
+                    found[bill_number] = {
+                        **bill,
+                        "LegislatureNumber": legislature_number,
+                    }
+    except _low.DataUnimplementedError:
+        return {}
+    # RuntimeError once every retry failed (including ServerErrors),
+    # ValueError if a page wasn't JSON, KeyError if it wasn't shaped like bills.
+    except (RuntimeError, ValueError, KeyError) as e:
+        logger.warning(
+            f"Bulk scrape of bills in {legislature_number} failed, "
+            f"falling back to one request per bill: {e!r}"
+        )
+
+    missing = sorted(wanted - set(found))
+    if missing:
+        logger.info(
+            f"Scraping {len(missing)} bills of {legislature_number} one at a time"
+        )
+        for bill_number, bill in zip(
+            missing,
+            await asyncio.gather(
+                *(scrape_bill_details(legislature_number, b) for b in missing)
+            ),
+        ):
+            if bill is not None:
+                found[bill_number] = bill
+    return found
+
+
 def scrape_votes(*, leg_num_and_member_codes: list[tuple[int, str]]) -> list[dict]:
+    """Scrape the votes of some members, holding them all in memory.
+
+    For big scrapes, prefer `scrape_votes_to_spool`.
+    """
+
     async def main():
-        tasks = [_scrape_votes_of(*t) for t in leg_num_and_member_codes]
-        results = []
-        for chunk in _util.chunks(tasks, 20):
-            chunk_votes = await asyncio.gather(*chunk)
-            for v in chunk_votes:
-                if v is None:
-                    continue
-                results.extend(v)
-        return results
+        async with _http.client_pool():
+            results = []
+            async for _leg_num, _code, votes in stream_votes(leg_num_and_member_codes):
+                if votes is not None:
+                    results.extend(votes)
+            return results
 
     results = asyncio.run(main())
     return results
 
 
-async def _scrape_votes_of(
-    leg_num: int, member_code: str
-) -> tuple[list[dict], list[dict]] | None:
+def scrape_votes_to_spool(
+    *,
+    leg_num_and_member_codes: list[tuple[int, str]],
+    spool: _spool.Spool,
+    max_workers: int = 20,
+    after_vote_numbers: dict[tuple[int, str], int] | None = None,
+) -> _spool.Spool:
+    """Scrape the votes of some members, appending each member's votes to `spool`.
+
+    Members that are already done in the spool (eg from a run that crashed
+    partway through) are skipped.
+
+    Parameters
+    ----------
+    after_vote_numbers:
+        For (LegislatureNumber, MemberCode) pairs in here,
+        only spool the votes numbered after this, eg because we already have the rest.
+    """
+    return asyncio.run(
+        scrape_votes_to_spool_async(
+            leg_num_and_member_codes=leg_num_and_member_codes,
+            spool=spool,
+            max_workers=max_workers,
+            after_vote_numbers=after_vote_numbers,
+        )
+    )
+
+
+async def scrape_votes_to_spool_async(
+    *,
+    leg_num_and_member_codes: list[tuple[int, str]],
+    spool: _spool.Spool,
+    max_workers: int = 20,
+    after_vote_numbers: dict[tuple[int, str], int] | None = None,
+) -> _spool.Spool:
+    if after_vote_numbers is None:
+        after_vote_numbers = {}
+    seen_roll_calls: set[tuple[int, str]] = set()
+    done = spool.done()
+    todo = [
+        (leg_num, code)
+        for leg_num, code in leg_num_and_member_codes
+        if _spool_key(leg_num, code) not in done
+    ]
+    logger.info(
+        f"Scraping votes for {len(todo)} members, "
+        f"{len(leg_num_and_member_codes) - len(todo)} already done in {spool.directory}"
+    )
+
+    async with _http.client_pool():
+        async for leg_num, code, votes in stream_votes(todo, max_workers=max_workers):
+            after = after_vote_numbers.get((leg_num, code))
+            if votes and after is not None:
+                votes = _votes_after(votes, after)
+            records = _compact_votes(votes or [], seen_roll_calls)
+            spool.write(_spool_key(leg_num, code), records)
+    return spool
+
+
+def _spool_key(leg_num: int, member_code: str) -> str:
+    return f"{leg_num}:{member_code}"
+
+
+VOTE_HEADER_FIELDS = ("LegislatureNumber", "VoteNum", "VoteDate", "Title", "Bill")
+"""The fields of a member's vote that are the same for everyone in the roll call."""
+
+
+def _compact_votes(votes: list[dict], seen: set[tuple[int, str]]) -> list[dict]:
+    """Turn a member's votes into spool records, without repeating each roll call.
+
+    Every vote in a member's response repeats its roll call's date, title and bill,
+    so a chamber's roll call comes back 20 to 40 times, once per member.
+    Instead, this gives a header record (with no Member) for each roll call
+    not already in `seen`, and for each vote, just who voted what.
+    `_ingest._read_vote_spool` joins them back together.
+    Votes without a VoteNum can't be matched to a header, so are kept whole.
+
+    This only shrinks the spool, each member's response is downloaded whole.
+    Paging through bills with their Votes would get the roll calls on bills once,
+    but we'd still need every member's votes for the ones that aren't on a bill,
+    and BASIS can only filter those by vote and title, not by bill.
+    """
+    records = []
+    for vote in votes:
+        roll_call = (vote["LegislatureNumber"], vote.get("VoteNum"))
+        if roll_call[1] is None:
+            records.append(vote)
+            continue
+        if roll_call not in seen:
+            seen.add(roll_call)
+            records.append({f: vote.get(f) for f in VOTE_HEADER_FIELDS})
+        records.append(
+            {
+                "LegislatureNumber": vote["LegislatureNumber"],
+                "VoteNum": vote["VoteNum"],
+                "Member": vote.get("Member"),
+                "Vote": vote.get("Vote"),
+            }
+        )
+    return records
+
+
+def _votes_after(votes: list[dict], after: int) -> list[dict]:
+    """Only the votes numbered after `after`, eg "H0027" and on when `after` is 26.
+
+    Votes with a VoteNum we can't parse are kept, for clean_choices to deal with.
+    """
+
+    def number(vote: dict) -> int | None:
+        try:
+            return int(vote["VoteNum"].strip()[1:])
+        except (KeyError, AttributeError, ValueError):
+            return None
+
+    return [v for v in votes if (n := number(v)) is None or n > after]
+
+
+async def has_journals_since(
+    leg_num: int, chamber: str, since: datetime.date
+) -> bool | None:
+    """Whether a chamber has a journal dated on or after `since`.
+
+    Every roll call vote is taken in a floor session, and every floor session
+    gets a journal, so if there are none, there can't be any new votes.
+    The Journals include takes chamber and date constraints,
+    so this is a small response, unlike every member's votes.
+
+    Returns None if we can't tell, eg the server didn't like the query.
+    The response is never taken from the cache, where the sessions endpoint
+    is kept for days, long enough to miss a week of votes.
+    An empty answer is also None, not False: we haven't checked what
+    `startdate=` format BASIS expects, and a format it ignores or rejects
+    might well look like no journals. So for now a chamber is never skipped.
+    """
+    try:
+        s = await _low.session(
+            queries=[f"Journals;chamber={chamber};startdate={since.isoformat()}"],
+            session=leg_num,
+            ttl=0,
+        )
+    except (_low.DataUnimplementedError, _low.ServerError) as e:
+        logger.warning(f"Couldn't check for new journals in {leg_num}{chamber}: {e}")
+        return None
+    if not s.get("Journals"):
+        # Don't assume an unfamiliar or empty response means no journals.
+        return None
+    return True
+
+
+async def stream_votes(
+    leg_num_and_member_codes: list[tuple[int, str]], *, max_workers: int = 20
+) -> AsyncIterator[tuple[int, str, list[dict] | None]]:
+    """Yield (LegislatureNumber, MemberCode, votes) as each member's votes arrive.
+
+    A fixed pool of `max_workers` workers pulls members off a queue,
+    so one slow member doesn't hold up the others,
+    and at most about `max_workers` members' votes are held in memory at once.
+    """
+
+    async def scrape(pair: tuple[int, str]) -> list[dict] | None:
+        return await _scrape_votes_of(*pair)
+
+    async for (leg_num, code), votes in _map_unordered(
+        scrape, leg_num_and_member_codes, max_workers
+    ):
+        yield leg_num, code, votes
+
+
+async def _map_unordered(
+    f: Callable[[T], Awaitable[R]], items: list[T], max_workers: int
+) -> AsyncIterator[tuple[T, R]]:
+    """Yield (item, await f(item)) for each item, in the order they finish.
+
+    A fixed pool of `max_workers` workers pulls items off a queue, in order,
+    so one slow item doesn't hold up the others,
+    and at most about `max_workers` results are held in memory at once.
+    If any call fails, the exception is raised here and the workers are cancelled.
+    Once we're `past_deadline()`, no more items are started,
+    and the ones that weren't are logged as deferred.
+    """
+    todo: asyncio.Queue[T] = asyncio.Queue()
+    for item in items:
+        todo.put_nowait(item)
+    done: asyncio.Queue[tuple[T, asyncio.Task[R]] | None] = asyncio.Queue(
+        maxsize=max_workers
+    )
+
+    async def work():
+        while not past_deadline():
+            try:
+                item = todo.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            call = asyncio.create_task(f(item))
+            try:
+                await asyncio.wait([call])
+            finally:
+                # Only does anything if this worker was cancelled first.
+                call.cancel()
+            # The consumer gets the result from the call, or raises its error.
+            await done.put((item, call))
+            if call.exception() is not None:
+                return
+
+    async def worker():
+        await work()
+        # Tell the consumer this worker is finished.
+        await done.put(None)
+
+    workers = [
+        asyncio.create_task(worker()) for _ in range(min(max_workers, len(items)))
+    ]
+    try:
+        n_running = len(workers)
+        while n_running:
+            result = await done.get()
+            if result is None:
+                n_running -= 1
+            else:
+                item, call = result
+                yield item, call.result()
+    finally:
+        for w in workers:
+            w.cancel()
+    deferred = [todo.get_nowait() for _ in range(todo.qsize())]
+    if deferred:
+        logger.warning(
+            f"Past the deadline, deferred {len(deferred)} of {len(items)}: {deferred}"
+        )
+
+
+async def _scrape_votes_of(leg_num: int, member_code: str) -> list[dict] | None:
     try:
         mems = await _low.members(
             session=leg_num,
@@ -180,7 +619,9 @@ async def _scrape_votes_of(
         )
     except _low.DataUnimplementedError:
         return None
-    except _low.ServerError:
+    except _low.ServerError as e:
+        if isinstance(e, _low.KnownServerError):
+            return None
         if (leg_num, member_code) in KNOWN_FAILING_MEMBERS:
             return None
         raise
@@ -191,18 +632,24 @@ async def _scrape_votes_of(
     return votes
 
 
-async def _prep_bill_versions(leg_num: int, bill: _low.Bill) -> list[dict]:
-    BillNumber = re.sub(" +", " ", bill["BillNumber"].strip())
+async def _prep_bill_versions(
+    leg_num: int,
+    bill: _low.Bill,
+    version_letters: list[str] | None = None,
+    *,
+    full_text: bool = True,
+) -> list[dict]:
+    """The rows of the BillVersion table for a bill's versions.
+
+    With `full_text=False`, the text isn't downloaded,
+    and the rows have no BillVersionFullText.
+    """
+    BillNumber = clean_bill_number(bill["BillNumber"])
     bill_id = f"{leg_num}:{BillNumber}"
 
     async def _version(raw_version: _low.BillVersion):
         bill_version_id = f"""{bill_id}:{raw_version["VersionLetter"]}"""
-        full_text = await _bill_version_text.get_bill_version_text(
-            legislature_number=leg_num,
-            bill_number=BillNumber,
-            version_letter=raw_version["VersionLetter"],
-        )
-        return {
+        row = {
             "BillVersionId": bill_version_id,
             "BillId": bill_id,
             "BillVersionLetter": raw_version["VersionLetter"],
@@ -225,10 +672,21 @@ async def _prep_bill_versions(leg_num: int, bill: _low.Bill) -> list[dict]:
             else None,
             "BillVersionWorkOrder": raw_version["WorkOrder"],
             "BillVersionPdfUrl": raw_version["Url"],
-            "BillVersionFullText": full_text,
         }
-
-    tasks = [_version(raw_version) for raw_version in bill["Versions"]]
+        if full_text:
+            row["BillVersionFullText"] = await _bill_version_text.get_bill_version_text(
+                legislature_number=leg_num,
+                bill_number=BillNumber,
+                version_letter=raw_version["VersionLetter"],
+            )
+        return row
+
+    raw_versions = bill["Versions"]
+    if version_letters is not None:
+        raw_versions = [
+            v for v in raw_versions if v["VersionLetter"] in version_letters
+        ]
+    tasks = [_version(raw_version) for raw_version in raw_versions]
     logger.debug(f"Scraping {len(tasks)} versions for {bill_id} in leg {leg_num}")
     result = await asyncio.gather(*tasks)
     logger.debug(
@@ -237,6 +695,11 @@ async def _prep_bill_versions(leg_num: int, bill: _low.Bill) -> list[dict]:
     return result
 
 
+def clean_bill_number(raw: str) -> str:
+    """eg "HB   16 " -> "HB 16", the same as `_parse._fix_BillNumber`."""
+    return re.sub(r"\s+", " ", raw.strip())
+
+
 KNOWN_FAILING_MEMBERS = [
     (18, "GRS"),
     (18, "HUD"),
@@ -1,12 +1,28 @@
 import ibis
+import pyarrow.compute as pc
 from ibis import _
 
 
 def split_choices(
-    *, choices_raw: ibis.Table, bills: ibis.Table, members: ibis.Table
+    *,
+    choices_raw: ibis.Table,
+    bills: ibis.Table,
+    members: ibis.Table,
+    materialize: bool = True,
 ) -> tuple[ibis.Table, ibis.Table]:
-    choices_raw = _add_bill_id(choices_raw, bills)
-    choices_raw = _add_member_id(choices_raw, members)
+    """Split cleaned choices (from `_parse.clean_choices`) into votes and choices.
+
+    If `materialize`, `choices_raw` is computed once into an Arrow table,
+    and joined to small lookups of just the bills and members of its legislatures.
+    All the validations then run as one aggregation over that.
+    Otherwise everything stays one lazy ibis expression,
+    and each validation recomputes all of `choices_raw`.
+    """
+    if materialize:
+        choices_raw = _add_ids_materialized(choices_raw, bills, members)
+    else:
+        choices_raw = _add_bill_id(choices_raw, bills)
+        choices_raw = _add_member_id(choices_raw, members)
 
     choices_raw = choices_raw.mutate(
         # VoteNum begins as eg "H0026"
@@ -52,6 +68,61 @@ def split_choices(
     return votes, choices
 
 
+def _add_ids_materialized(
+    choices: ibis.Table, bills: ibis.Table, members: ibis.Table
+) -> ibis.Table:
+    """Add BillId and MemberId, checking the same things as `_add_bill_id` and
+    `_add_member_id`, but computing `choices` only once."""
+    arrow = choices.to_pyarrow()
+    choices = ibis.memtable(arrow, schema=choices.schema())
+    leg_nums = pc.unique(arrow["LegislatureNumber"]).drop_null().to_pylist()
+    bill_id_lookup = ibis.memtable(
+        bills.filter(bills.LegislatureNumber.isin(leg_nums))
+        .select("LegislatureNumber", "BillNumber", "BillId")
+        .to_pyarrow()
+    )
+    member_id_lookup = ibis.memtable(
+        members.filter(
+            members.LegislatureNumber.isin(leg_nums), members.MemberCode.notnull()
+        )
+        .select("LegislatureNumber", "MemberCode", "MemberId")
+        .to_pyarrow()
+    )
+    joined = (
+        choices.left_join(bill_id_lookup, ["LegislatureNumber", "BillNumber"])
+        .drop("LegislatureNumber_right", "BillNumber_right")
+        .left_join(member_id_lookup, ["LegislatureNumber", "MemberCode"])
+        .drop("LegislatureNumber_right", "MemberCode_right")
+    )
+    joined = ibis.memtable(joined.to_pyarrow(), schema=joined.schema())
+
+    # The lookups have no null IDs, so after the left joins, a null ID means
+    # that (LegislatureNumber, BillNumber) or (LegislatureNumber, MemberCode)
+    # has no match: the same as an anti-join on the composite key.
+    # A duplicated key in the lookups would fan out the join,
+    # so compare the number of rows too.
+    leg = _.LegislatureNumber.cast(str) + ":"
+    missing_bill = _.BillNumber.notnull() & _.BillId.isnull()
+    missing_member = _.MemberCode.notnull() & _.MemberId.isnull()
+    bill_keys = (leg + _.BillNumber).collect(where=missing_bill, distinct=True)
+    member_keys = (leg + _.MemberCode).collect(where=missing_member, distinct=True)
+    checks = (
+        joined.aggregate(
+            n_rows=_.count(),
+            n_missing_bills=missing_bill.sum(),
+            missing_bills=bill_keys[:10],
+            n_missing_members=missing_member.sum(),
+            missing_members=member_keys[:10],
+        )
+        .to_pyarrow()
+        .to_pylist()[0]
+    )
+    assert checks["n_rows"] == arrow.num_rows, checks
+    assert not checks["n_missing_bills"], checks
+    assert not checks["n_missing_members"], checks
+    return joined
+
+
 def _add_bill_id(choices: ibis.Table, bills: ibis.Table) -> ibis.Table:
     dupes = (
         bills.group_by("LegislatureNumber", "BillNumber")
@@ -61,13 +132,15 @@ def _add_bill_id(choices: ibis.Table, bills: ibis.Table) -> ibis.Table:
     )
     assert len(dupes) == 0, dupes
     bill_id_lookup = bills.select("LegislatureNumber", "BillNumber", "BillId")
-    missing = choices.filter(
-        _.LegislatureNumber.notnull(),
-        _.BillNumber.notnull(),
-        _.LegislatureNumber.notin(bill_id_lookup.LegislatureNumber),
-        _.BillNumber.notin(bill_id_lookup.BillNumber),
+    missing = (
+        choices.filter(_.LegislatureNumber.notnull(), _.BillNumber.notnull())
+        .select("LegislatureNumber", "BillNumber")
+        .anti_join(bill_id_lookup, ["LegislatureNumber", "BillNumber"])
+        .distinct()
+        .limit(10)
+        .execute()
     )
-    assert missing.count().execute() == 0
+    assert len(missing) == 0, missing
     return choices.left_join(bill_id_lookup, ["LegislatureNumber", "BillNumber"]).drop(
         "LegislatureNumber_right", "BillNumber_right"
     )
@@ -89,15 +162,17 @@ def _add_member_id(choices: ibis.Table, members: ibis.Table) -> ibis.Table:
         .all()
         .execute()
     )
-    # check that every (LegislatureNumber, MemberCode) combo is votes
-    # is also present in bill_id_lookup
-    missing = choices.filter(
-        _.LegislatureNumber.notnull(),
-        _.MemberCode.notnull(),
-        _.LegislatureNumber.notin(member_id_lookup.LegislatureNumber),
-        _.MemberCode.notin(member_id_lookup.MemberCode),
+    # check that every (LegislatureNumber, MemberCode) combo in votes
+    # is also present in member_id_lookup
+    missing = (
+        choices.filter(_.LegislatureNumber.notnull(), _.MemberCode.notnull())
+        .select("LegislatureNumber", "MemberCode")
+        .anti_join(member_id_lookup, ["LegislatureNumber", "MemberCode"])
+        .distinct()
+        .limit(10)
+        .execute()
     )
-    assert missing.count().execute() == 0
+    assert len(missing) == 0, missing
     return choices.left_join(
         member_id_lookup, ["LegislatureNumber", "MemberCode"]
     ).drop("LegislatureNumber_right", "MemberCode_right")
@@ -0,0 +1,93 @@
+"""A durable, append-only spool of scraped records on local disk.
+
+Scrapers append each unit of work's records to the spool as soon as it
+finishes, then mark that unit as done. If the process crashes,
+the next run can skip every unit that was already marked done.
+
+    spool/
+        records.jsonl  # one scraped record per line
+        done.jsonl     # one finished unit of work per line
+        created        # when this spool was started
+
+A unit's records are written before it is marked done, so a crash in between
+means that unit is scraped again, and its records appear twice in `records.jsonl`.
+Consumers should de-duplicate, which they already do.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import logging
+import os
+import shutil
+from collections.abc import Iterable
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class Spool:
+    """A directory of JSONL files that scraped records are appended to.
+
+    Parameters
+    ----------
+    directory:
+        Where to store the spool. Created if it doesn't exist.
+    max_age:
+        If the existing spool is older than this, it is stale
+        (eg left over from last night's crashed run), so start a fresh one.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        max_age: datetime.timedelta = datetime.timedelta(hours=20),
+    ) -> None:
+        self.directory = Path(directory)
+        created_path = self.directory / "created"
+        if created_path.exists():
+            created = datetime.datetime.fromisoformat(created_path.read_text())
+            if datetime.datetime.now(datetime.UTC) - created > max_age:
+                logger.info(f"Discarding stale spool from {created} in {directory}")
+                self.clear()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if not created_path.exists():
+            created_path.write_text(datetime.datetime.now(datetime.UTC).isoformat())
+        self.records_path.touch()
+        self.done_path.touch()
+
+    @property
+    def records_path(self) -> Path:
+        return self.directory / "records.jsonl"
+
+    @property
+    def done_path(self) -> Path:
+        return self.directory / "done.jsonl"
+
+    def done(self) -> set[str]:
+        """The keys of the units of work that have been finished."""
+        with open(self.done_path) as f:
+            return {json.loads(line) for line in f if line.strip()}
+
+    def write(self, key: str, records: Iterable[dict]) -> None:
+        """Durably append the records of a unit of work, then mark it as done."""
+        with open(self.records_path, "a") as f:
+            for record in records:
+                f.write(json.dumps(record))
+                f.write("\n")
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self.done_path, "a") as f:
+            f.write(json.dumps(key))
+            f.write("\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def is_empty(self) -> bool:
+        return self.records_path.stat().st_size == 0
+
+    def clear(self) -> None:
+        """Delete the spool, eg once its records are safely in the database."""
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,155 @@
+"""A persistent record of BASIS requests that we know don't work.
+
+eg asking for the members of the 9th legislature always says
+"Invalid Session Number", and asking for the votes of some members
+of the 18th legislature always returns a FaultException.
+Without this, every nightly run would re-make these requests,
+and sit through all the retry backoff for them too.
+
+Entries expire after `recheck_after`, so that if the librarians
+digitize some old data, we eventually pick it up,
+and a request that works again is forgotten right away.
+Requests about the current legislature are never skipped,
+since its data is still being filled in.
+"""
+
+from __future__ import annotations
+
+import datetime
+import functools
+import json
+import logging
+import os
+import uuid
+from collections.abc import Iterable
+from pathlib import Path
+
+from alaska_legislative_data import _util
+
+logger = logging.getLogger(__name__)
+
+
+class UnavailableRegistry:
+    """A JSON file of requests that failed, and how.
+
+    Parameters
+    ----------
+    path:
+        The JSON file to persist to.
+    recheck_after:
+        Try a request again if it last failed longer ago than this.
+    min_server_errors:
+        A ServerError only counts as reproducible (and so is skipped in future)
+        once it has happened in this many separate runs, within `recheck_after`.
+        "Invalid Session Number" is always reproducible, so it counts right away.
+        Each registry object is one run, so one run failing the same request
+        over and over only counts once.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        recheck_after: datetime.timedelta = datetime.timedelta(days=30),
+        min_server_errors: int = 2,
+    ) -> None:
+        self.path = Path(path)
+        self.recheck_after = recheck_after
+        self.min_server_errors = min_server_errors
+        self.run_id = uuid.uuid4().hex
+        try:
+            self._entries: dict[str, dict] = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            self._entries = {}
+
+    def lookup(
+        self,
+        endpoint: str,
+        *,
+        session: int | None,
+        chamber: str | None,
+        queries: Iterable[str],
+    ) -> str | None:
+        """If this request is known to fail, the kind of failure, else None.
+
+        The kind is either "unimplemented" or "server_error".
+        """
+        entry = self._entries.get(_key(endpoint, session, chamber, queries))
+        if entry is None or self._expired(entry):
+            return None
+        if (
+            entry["kind"] == "server_error"
+            and len(entry.get("runs", [])) < self.min_server_errors
+        ):
+            return None
+        return entry["kind"]
+
+    def record(
+        self,
+        endpoint: str,
+        *,
+        session: int | None,
+        chamber: str | None,
+        queries: Iterable[str],
+        kind: str,
+    ) -> None:
+        """Record that a request failed.
+
+        The runs it failed in are only added up while the failures keep happening,
+        an entry that is expired or of another kind is started over.
+        """
+        key = _key(endpoint, session, chamber, queries)
+        entry = self._entries.get(key)
+        runs = []
+        if entry is not None and entry["kind"] == kind and not self._expired(entry):
+            runs = entry.get("runs", [])
+        if self.run_id not in runs:
+            runs = [*runs, self.run_id]
+        self._entries[key] = {
+            "kind": kind,
+            # Only the latest are needed to tell if it's reproducible.
+            "runs": runs[-self.min_server_errors :],
+            "last_failed": _now().isoformat(),
+        }
+        logger.info(f"Recorded {key} as {kind} (in {len(runs)} runs)")
+        self._save()
+
+    def clear(
+        self,
+        endpoint: str,
+        *,
+        session: int | None,
+        chamber: str | None,
+        queries: Iterable[str],
+    ) -> None:
+        """Forget any failures of a request, eg because it just worked."""
+        key = _key(endpoint, session, chamber, queries)
+        if self._entries.pop(key, None) is not None:
+            logger.info(f"{key} works again")
+            self._save()
+
+    def _expired(self, entry: dict) -> bool:
+        last_failed = datetime.datetime.fromisoformat(entry["last_failed"])
+        return _now() - last_failed > self.recheck_after
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self._entries, indent=2, sort_keys=True))
+        os.replace(tmp, self.path)
+
+
+@functools.cache
+def default_registry() -> UnavailableRegistry:
+    """The registry in `$AK_LEG_DATA_DIR/unavailable.json`."""
+    return UnavailableRegistry(_util.data_dir() / "unavailable.json")
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.UTC)
+
+
+def _key(
+    endpoint: str, session: int | None, chamber: str | None, queries: Iterable[str]
+) -> str:
+    return f"{endpoint}|session={session}|chamber={chamber}|{','.join(queries)}"
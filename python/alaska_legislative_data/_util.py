@@ -1,4 +1,6 @@
 import datetime
+import os
+from pathlib import Path
 
 
 def current_leg_num_approx(current_year: int | None = None) -> int:
@@ -14,15 +16,15 @@ def current_leg_num_approx(current_year: int | None = None) -> int:
     return (current_year - 2023) // 2 + 33
 
 
-assert current_leg_num_approx(2021) == 32, current_leg_num_approx(2021)
-assert current_leg_num_approx(2022) == 32, current_leg_num_approx(2022)
-assert current_leg_num_approx(2023) == 33, current_leg_num_approx(2023)
-assert current_leg_num_approx(2024) == 33, current_leg_num_approx(2024)
-assert current_leg_num_approx(2025) == 34, current_leg_num_approx(2025)
-assert current_leg_num_approx(2026) == 34, current_leg_num_approx(2026)
-
-
 def chunks(items, n: int):
     items = list(items)
     for i in range(0, len(items), n):
         yield items[i : i + n]
+
+
+def data_dir() -> Path:
+    """Where to keep local working files, eg spools of scraped records.
+
+    Set with the `AK_LEG_DATA_DIR` environment variable, defaults to `.ak-leg-data`.
+    """
+    return Path(os.environ.get("AK_LEG_DATA_DIR", ".ak-leg-data"))
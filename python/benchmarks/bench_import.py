@@ -0,0 +1,59 @@
+"""Time how long it takes to import what each CLI command needs.
+
+    python benchmarks/bench_import.py [repeat]
+
+Each import is run in a fresh interpreter with `python -X importtime`,
+and the median total is reported, along with the modules that took the longest
+themselves (not counting what they import) in the median run.
+`tests/test_import_time.py` guards which modules get imported.
+"""
+
+from __future__ import annotations
+
+import statistics
+import subprocess
+import sys
+
+TARGETS = {
+    "package": "alaska_legislative_data",
+    "_parse": "alaska_legislative_data._parse",
+    "export": "alaska_legislative_data._export",
+    "ingest": "alaska_legislative_data._ingest",
+}
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """Microseconds each module took to import itself, from `-X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    # eg "import time:       325 |       1020 |   alaska_legislative_data._db"
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def main(repeat: int = 5) -> None:
+    print(f"Median of {repeat} runs\n")
+    for target, module in TARGETS.items():
+        runs = sorted(
+            (_import_times(module) for _ in range(repeat)),
+            key=lambda times: sum(times.values()),
+        )
+        median = runs[len(runs) // 2]
+        total_ms = statistics.median(sum(t.values()) for t in runs) / 1000
+        print(f"{target:<10} {total_ms:>8.0f} ms  {len(median):>5} modules")
+        heaviest = sorted(median.items(), key=lambda item: -item[1])[:5]
+        for name, us in heaviest:
+            print(f"    {us / 1000:>8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,82 @@
+"""Compare rows/sec of `db.insert()` and `_db.upsert()` into Postgres.
+
+    python benchmarks/bench_load.py [n_rows]
+
+Uses `DATABASE_URL` (eg from your `.env`), the same as `_db.get_db()`.
+For each table, it copies a sample of existing rows, with fresh primary keys,
+into a scratch copy of that table, once per loader,
+then loads the same rows again, like re-ingesting data that hasn't changed.
+The scratch tables are dropped afterwards, so the real tables aren't touched.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+import ibis
+
+from alaska_legislative_data import _db
+
+TABLES = {
+    "bills": "BillId",
+    "votes": "VoteId",
+    "choices": "ChoiceId",
+    "billVersions": "BillVersionId",
+}
+
+
+def _scratch_copy(db: _db.Backend, table_name: str) -> str:
+    source, _ = _db._postgres_names(db, table_name, [])
+    scratch = ibis.util.gen_name(f"bench_{table_name}")
+    _db._postgres_execute(
+        db,
+        f"CREATE UNLOGGED TABLE {_db._quote(db.current_database, scratch)} "
+        f"(LIKE {source} INCLUDING ALL)",
+    )
+    db.raw_sql("CALL pg_clear_cache()")
+    return scratch
+
+
+def _drop(db: _db.Backend, table_name: str) -> None:
+    table = _db._quote(db.current_database, table_name)
+    _db._postgres_execute(db, f"DROP TABLE IF EXISTS {table}")
+    db.raw_sql("CALL pg_clear_cache()")
+
+
+def _load_with_insert(db: _db.Backend, table_name: str, rows: ibis.Table, key: str):
+    new = rows.anti_join(db.table(table_name), key)
+    if new.count().execute() > 0:
+        db.insert(table_name, new)
+
+
+def _load_with_upsert(db: _db.Backend, table_name: str, rows: ibis.Table, key: str):
+    _db.upsert(db, table_name, rows, key=key)
+
+
+def main(n_rows: int = 20_000) -> None:
+    db = _db.get_db()
+    loaders = {"db.insert": _load_with_insert, "upsert": _load_with_upsert}
+    columns = [f"{name} {load}" for name in loaders for load in ("new", "again")]
+    print(f"{'table':<14} " + " ".join(f"{c:>20}" for c in columns))
+    for table_name, key in TABLES.items():
+        sample = db.table(table_name).limit(n_rows).to_pyarrow()
+        rows = ibis.memtable(sample).mutate(
+            **{key: ibis.literal("bench:") + ibis.row_number().cast(str)}
+        )
+        cells = []
+        for load in loaders.values():
+            scratch = _scratch_copy(db, table_name)
+            try:
+                for _ in range(2):
+                    start = time.monotonic()
+                    load(db, scratch, rows, key)
+                    seconds = time.monotonic() - start
+                    cells.append(f"{sample.num_rows / seconds:>14.0f} rows/s")
+            finally:
+                _drop(db, scratch)
+        print(f"{table_name:<14} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
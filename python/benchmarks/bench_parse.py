@@ -0,0 +1,144 @@
+"""Time how long `_low._parse` takes per endpoint, with each available JSON decoder.
+
+    python benchmarks/bench_parse.py
+
+If `AK_LEG_CACHE_DIR` points at a populated response cache,
+real cached bodies are used, grouped by endpoint.
+Otherwise synthetic payloads shaped like BASIS responses are generated,
+at roughly the size of the big ones (members+Votes, bills+Subjects).
+"""
+
+from __future__ import annotations
+
+import collections
+import importlib
+import json
+import os
+import random
+import statistics
+import time
+from collections.abc import Callable
+
+from alaska_legislative_data import _cache, _low
+
+
+def _decoders() -> dict[str, Callable[[bytes], object]]:
+    decoders: dict[str, Callable[[bytes], object]] = {
+        "json (str)": lambda raw: json.loads(raw.decode("utf-8")),
+        "json (bytes)": json.loads,
+    }
+    for name, attr in [("orjson", "loads"), ("msgspec", "json.decode")]:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            continue
+        for part in attr.split("."):
+            module = getattr(module, part)
+        decoders[name] = module
+    return decoders
+
+
+def _synthetic_payloads() -> dict[str, list[bytes]]:
+    rng = random.Random(0)
+
+    def vote(i: int) -> dict:
+        return {
+            "Bill": f"HB {i % 400}",
+            "Date": f"/Date({1700000000000 + i * 60_000})/",
+            "Title": "Moved to third reading " * 3,
+            "VoteNum": str(i),
+            "Vote": rng.choice(["Y", "N", "A", "E"]),
+            "Chamber": "H",
+        }
+
+    def member(i: int) -> dict:
+        return {
+            "Code": f"M{i:03}",
+            "FirstName": "First",
+            "LastName": f"Last{i}",
+            "Chamber": "H",
+            "District": str(i % 40),
+            "Party": rng.choice(["R", "D", "N"]),
+            "Votes": [vote(i * 1000 + j) for j in range(1_500)],
+        }
+
+    def bill(i: int) -> dict:
+        return {
+            "Number": f"HB {i}",
+            "ShortTitle": "An act relating to " * 4,
+            "StatusCode": "(H) STA",
+            "Subjects": [{"Subject": f"Subject {j}"} for j in range(12)],
+            "Actions": [
+                {
+                    "Date": f"/Date({1700000000000 + j * 86_400_000})/",
+                    "Action": "REFERRED TO STATE AFFAIRS " * 2,
+                    "Chamber": "H",
+                }
+                for j in range(25)
+            ],
+        }
+
+    def wrap(key: str, items: list[dict]) -> bytes:
+        return json.dumps({"Basis": {key: items}}).encode("utf-8")
+
+    return {
+        "members+Votes": [wrap("Members", [member(i) for i in range(20)])],
+        "bills+Subjects+Actions": [wrap("Bills", [bill(i) for i in range(1_000)])],
+    }
+
+
+def _cached_payloads(cache: _cache.ResponseCache) -> dict[str, list[bytes]]:
+    by_endpoint: dict[str, list[bytes]] = collections.defaultdict(list)
+    for path in (cache.directory / "entries").glob("*/*.json"):
+        entry = _cache.CacheEntry(**json.loads(path.read_text()))
+        endpoint = _cache._endpoint(entry.url)
+        if endpoint == "Plaintext":
+            continue
+        by_endpoint[endpoint].append(cache.read(entry))
+    return dict(by_endpoint)
+
+
+def _time(f: Callable[[], object], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(repeat: int = 5) -> None:
+    cache = _cache.ResponseCache.from_env()
+    payloads = {}
+    if cache is not None:
+        payloads = _cached_payloads(cache)
+        source = f"cache at {cache.directory}"
+    if not payloads:
+        payloads = _synthetic_payloads()
+        source = "synthetic payloads"
+    print(f"Parsing {source}, median of {repeat} runs\n")
+
+    decoders = _decoders()
+    print(f"{'endpoint':<24} {'MB':>7}  " + "  ".join(f"{d:>13}" for d in decoders))
+    for endpoint, bodies in sorted(payloads.items()):
+        mb = sum(len(b) for b in bodies) / 1e6
+        cells = []
+        for decode in decoders.values():
+            seconds = _time(
+                lambda decode=decode, bodies=bodies: [decode(b) for b in bodies], repeat
+            )
+            cells.append(f"{seconds * 1000:>10.1f} ms")
+        print(f"{endpoint:<24} {mb:>7.2f}  " + "  ".join(cells))
+
+    print(f"\n_low._parse is currently using {_low._json_loads.__module__}")
+    for endpoint, bodies in sorted(payloads.items()):
+        seconds = _time(
+            lambda bodies=bodies: [_low._parse("", {}, b) for b in bodies], repeat
+        )
+        print(f"  {endpoint:<22} {seconds * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    if os.environ.get("AK_LEG_CACHE_DIR") is None:
+        print("AK_LEG_CACHE_DIR is not set, so not using any cached responses.")
+    main()
@@ -0,0 +1,82 @@
+"""Time parsing BASIS "/Date(...)/" strings, with a python UDF and natively.
+
+    python benchmarks/bench_sessions.py [n_rows]
+
+`clean_and_split_legislatures_into_sessions` used to parse session dates
+with a python UDF, which DuckDB calls row by row.
+This times that against `_parse._parse_epoch_date` on `n_rows` synthetic dates,
+and then the whole of `clean_and_split_legislatures_into_sessions`
+for every legislature.
+"""
+
+from __future__ import annotations
+
+import datetime
+import sys
+import time
+
+import ibis
+import numpy as np
+
+from alaska_legislative_data import _parse
+
+
+@ibis.udf.scalar.python(signature=(("string",), "date"))
+def _python_udf(s: str) -> datetime.date:
+    # What clean_and_split_legislatures_into_sessions used to do.
+    n_millis = int(s[6:-2])
+    return datetime.date.fromtimestamp(n_millis / 1000)
+
+
+def _dates(n_rows: int) -> ibis.Table:
+    rng = np.random.default_rng(0)
+    millis = rng.integers(-300_000_000_000, 1_800_000_000_000, n_rows)
+    strings = np.char.add(np.char.add("/Date(", millis.astype(str)), ")/")
+    return ibis.memtable({"s": strings})
+
+
+def _legislatures() -> ibis.Table:
+    raw = []
+    for leg_num in range(1, 35):
+        year = 1959 + 2 * (leg_num - 1)
+        start = datetime.datetime(year, 1, 15, 9, tzinfo=datetime.UTC)
+        end = datetime.datetime(year, 5, 16, 9, tzinfo=datetime.UTC)
+        session = {
+            "ID": "10",
+            "Title": "First Regular Session",
+            "StartDate": f"/Date({int(start.timestamp() * 1000)})/",
+            "EndDate": f"/Date({int(end.timestamp() * 1000)})/",
+        }
+        raw.append(
+            {"LegislatureNumber": leg_num, "Year": str(year), "SessionDates": [session]}
+        )
+    return ibis.memtable(raw)
+
+
+def _time(f) -> float:
+    start = time.perf_counter()
+    f()
+    return time.perf_counter() - start
+
+
+def main(n_rows: int = 1_000_000) -> None:
+    con = ibis.duckdb.connect()
+    dates = con.create_table("dates", _dates(n_rows))
+    parsers = {"python UDF": _python_udf, "native": _parse._parse_epoch_date}
+    for name, parse in parsers.items():
+        seconds = _time(lambda parse=parse: dates.select(d=parse(dates.s)).to_pyarrow())
+        print(f"{name:<12} {n_rows:,} dates in {seconds * 1000:>8.1f} ms")
+
+    legislatures = _legislatures()
+
+    def clean_and_split():
+        legs, sessions = _parse.clean_and_split_legislatures_into_sessions(legislatures)
+        legs.to_pyarrow()
+        sessions.to_pyarrow()
+
+    seconds = _time(clean_and_split)
+    print(f"clean_and_split_legislatures_into_sessions: {seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,138 @@
+"""Time `clean_choices` + `split_choices`, lazily and materialized, on a big history.
+
+    python benchmarks/bench_split.py [n_legislatures]
+
+Generates a synthetic full history of raw vote records, shaped like the vote spool:
+by default 16 legislatures of 1,500 roll calls each in each chamber,
+with every member choosing on every one, about 1.4 million choices.
+The data is written to Parquet first, then each mode runs in a fresh subprocess
+reading from it, so its peak memory (max RSS) is its own.
+"""
+
+from __future__ import annotations
+
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import ibis
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from alaska_legislative_data import _parse, _split_choices
+
+CHAMBER_SIZES = {"H": 40, "S": 20}
+VOTES_PER_CHAMBER = 1_500
+BILLS_PER_LEGISLATURE = 600
+
+
+def _bills_and_members(leg_nums: list[int]) -> tuple[pa.Table, pa.Table]:
+    bills = [
+        {
+            "LegislatureNumber": leg_num,
+            "BillNumber": f"HB {i}",
+            "BillId": f"{leg_num}:HB {i}",
+        }
+        for leg_num in leg_nums
+        for i in range(1, BILLS_PER_LEGISLATURE + 1)
+    ]
+    members = [
+        {
+            "LegislatureNumber": leg_num,
+            "MemberCode": f"{chamber}{i:02}",
+            "MemberId": f"{leg_num}:{chamber}:{i}:person{chamber}{i}",
+        }
+        for leg_num in leg_nums
+        for chamber, size in CHAMBER_SIZES.items()
+        for i in range(size)
+    ]
+    return pa.Table.from_pylist(bills), pa.Table.from_pylist(members)
+
+
+def _raw_choices(leg_nums: list[int]) -> pa.Table:
+    rng = np.random.default_rng(0)
+    columns: dict[str, list[np.ndarray]] = {
+        "LegislatureNumber": [],
+        "VoteNum": [],
+        "VoteDate": [],
+        "Title": [],
+        "Bill": [],
+        "Member": [],
+        "Vote": [],
+    }
+    for leg_num in leg_nums:
+        for chamber, size in CHAMBER_SIZES.items():
+            vote_nums = np.arange(1, VOTES_PER_CHAMBER + 1)
+            vote_codes = np.char.add(chamber, np.char.zfill(vote_nums.astype(str), 4))
+            member_codes = np.char.add(
+                chamber, np.char.zfill(np.arange(size).astype(str), 2)
+            )
+            n = len(vote_nums) * size
+            bill_nums = rng.integers(1, BILLS_PER_LEGISLATURE + 1, len(vote_nums))
+            amendment = rng.integers(1, 30, len(vote_nums))
+            titles = np.where(
+                amendment < 10,
+                np.char.add("Amendment No. ", amendment.astype(str)),
+                "Third Reading Final Passage",
+            )
+            days = np.datetime64(f"{1995 + 2 * (leg_num - 19)}-01-15") + vote_nums // 20
+            columns["LegislatureNumber"].append(np.full(n, leg_num, dtype=np.int16))
+            columns["VoteNum"].append(np.repeat(vote_codes, size))
+            columns["VoteDate"].append(np.repeat(days.astype(str), size))
+            columns["Title"].append(np.repeat(titles, size))
+            columns["Bill"].append(
+                np.repeat(np.char.add("HB   ", bill_nums.astype(str)), size)
+            )
+            columns["Member"].append(np.tile(member_codes, len(vote_nums)))
+            columns["Vote"].append(rng.choice(["Y", "N", "A", "E"], n))
+    return pa.table({k: np.concatenate(v) for k, v in columns.items()})
+
+
+def run(mode: str, directory: Path) -> None:
+    # Read from disk, like db.Bill, db.Member and the vote spool,
+    # so that generating the data doesn't count towards the peak memory.
+    con = ibis.duckdb.connect()
+    bills = con.read_parquet(directory / "bills.parquet")
+    members = con.read_parquet(directory / "members.parquet")
+    choices_raw = con.read_parquet(directory / "raw_choices.parquet")
+
+    start = time.perf_counter()
+    choices = _parse.clean_choices(choices_raw)
+    votes, choices = _split_choices.split_choices(
+        choices_raw=choices,
+        bills=bills,
+        members=members,
+        materialize=mode == "materialized",
+    )
+    votes, choices = votes.to_pyarrow(), choices.to_pyarrow()
+    seconds = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"{mode:<14} {choices.num_rows:>10,} choices {votes.num_rows:>8,} votes "
+        f"{seconds:>8.1f} s {peak_mb:>8.0f} MB peak RSS"
+    )
+
+
+def main(n_legislatures: int = 16) -> None:
+    leg_nums = list(range(34 - n_legislatures + 1, 35))
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        bills, members = _bills_and_members(leg_nums)
+        pq.write_table(bills, directory / "bills.parquet")
+        pq.write_table(members, directory / "members.parquet")
+        pq.write_table(_raw_choices(leg_nums), directory / "raw_choices.parquet")
+        for mode in ["lazy", "materialized"]:
+            subprocess.run(
+                [sys.executable, __file__, "--run", mode, str(directory)], check=True
+            )
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--run"]:
+        run(sys.argv[2], Path(sys.argv[3]))
+    else:
+        main(*(int(arg) for arg in sys.argv[1:]))
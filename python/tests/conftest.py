@@ -1,6 +1,10 @@
+import os
+
 import ibis
 import pytest
 
+from alaska_legislative_data import _db
+
 
 def pytest_addoption(parser) -> None:
     parser.addoption(
@@ -12,3 +16,47 @@ def pytest_addoption(parser) -> None:
 def bills(request) -> ibis.Table:
     aug_dir = request.config.getoption("--augmented-dir")
     return ibis.read_parquet(f"{aug_dir}/bills.parquet")
+
+
+@pytest.fixture
+def db() -> _db.Backend:
+    """An in-memory database made from `_db.DDL`, with every legislature in it."""
+    backend = _db.Backend(ibis.duckdb.connect(), check_structure=False)
+    _db.Backend.create_tables(backend)
+    backend.raw_sql(
+        "INSERT INTO legislatures "
+        "SELECT n, 1957 + 2 * n, 1958 + 2 * n FROM range(1, 40) AS t(n)"
+    )
+    return backend
+
+
+@pytest.fixture
+def postgres() -> _db.Backend:
+    """The Postgres database at `AK_LEG_TEST_DATABASE_URL`, eg a throwaway local one.
+
+    The tests get a fresh schema of their own, with `people` and `votes` tables,
+    which is dropped afterwards, so nothing else in the database is touched.
+    """
+    url = os.environ.get("AK_LEG_TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("AK_LEG_TEST_DATABASE_URL not set")
+    schema = ibis.util.gen_name("test")
+    con = ibis.duckdb.connect()
+    _db.attach_postgres(con, url, name="setup")
+    con.raw_sql(
+        f"CALL postgres_execute('setup', "
+        f"'CREATE SCHEMA {schema}; "
+        f"CREATE TABLE {schema}.people "
+        f'("PersonId" TEXT PRIMARY KEY, "FullName" TEXT NOT NULL, '
+        f'"FirstName" TEXT NOT NULL, "LastName" TEXT NOT NULL); '
+        f"CREATE TABLE {schema}.votes "
+        f'("VoteId" TEXT PRIMARY KEY, "LegislatureNumber" SMALLINT, '
+        f'"VoteChamber" TEXT, "VoteNumber" INTEGER, "VoteTitle" TEXT, '
+        f'"VoteDescription" TEXT NOT NULL)\')'
+    )
+    _db.attach_postgres(con, url, name="postgres", schema=schema)
+    con.raw_sql("USE postgres")
+    try:
+        yield _db.Backend(con, check_structure=False)
+    finally:
+        con.raw_sql(f"CALL postgres_execute('setup', 'DROP SCHEMA {schema} CASCADE')")
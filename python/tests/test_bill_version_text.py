@@ -0,0 +1,68 @@
+import asyncio
+
+import httpx
+import pytest
+
+from alaska_legislative_data import _bill_version_text, _http
+
+
+def _get_text(monkeypatch, handler) -> tuple[str, list[float]]:
+    """Get the text of 34:HB 1:A from `handler`.
+
+    Returns it, and how long it slept for, without actually sleeping that long.
+    """
+    sleeps = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        await real_sleep(min(seconds, 0.01))
+
+    monkeypatch.setattr(_http.asyncio, "sleep", sleep)
+
+    async def main():
+        async with _http.client_pool(cache=False) as pool:
+            await pool._client.aclose()
+            pool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            return await _bill_version_text.get_bill_version_text(
+                legislature_number=34, bill_number="HB 1", version_letter="A"
+            )
+
+    return asyncio.run(main()), sleeps
+
+
+def test_missing_version_is_not_retried(monkeypatch):
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(str(request.url))
+        return httpx.Response(404)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        _get_text(monkeypatch, handler)
+    assert requested == ["https://www.akleg.gov/basis/Bill/Plaintext/34?Hsid=HB0001A"]
+
+
+def test_waits_as_long_as_the_server_asks(monkeypatch):
+    responses = [
+        httpx.Response(503, headers={"Retry-After": "7"}),
+        httpx.Response(200, text="00 HOUSE BILL NO. 1\n01 An Act"),
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return responses.pop(0)
+
+    text, sleeps = _get_text(monkeypatch, handler)
+    assert text == "HOUSE BILL NO. 1\nAn Act"
+    # Without Retry-After, the first retry would be after at most 0.5s.
+    assert max(sleeps) >= 7
+
+
+def test_decodes_with_the_charset_the_server_sends(monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = "00 Relating to the Café Act\n01 §1".encode("windows-1252")
+        headers = {"Content-Type": "text/plain; charset=windows-1252"}
+        return httpx.Response(200, content=body, headers=headers)
+
+    text, _sleeps = _get_text(monkeypatch, handler)
+    assert text == "Relating to the Café Act\n§1"
@@ -0,0 +1,150 @@
+import asyncio
+import functools
+import os
+import time
+
+import httpx
+import pytest
+
+from alaska_legislative_data import _cache, _http
+
+URL = "https://www.akleg.gov/publicservice/basis/bills?json=true&session=34"
+HEADERS = {"X-Alaska-Legislature-Basis-Query": "bills"}
+
+
+def _response(body: bytes, **headers) -> httpx.Response:
+    return httpx.Response(200, content=body, headers=headers)
+
+
+def _age(path, days: float) -> None:
+    then = time.time() - days * 24 * 60 * 60
+    os.utime(path, (then, then))
+
+
+def test_store_then_lookup(tmp_path):
+    cache = _cache.ResponseCache(tmp_path)
+    assert cache.lookup(URL, HEADERS) is None
+    cache.store(URL, HEADERS, _response(b"body", ETag='"v1"'))
+    entry = cache.lookup(URL, HEADERS)
+    assert cache.read(entry) == b"body"
+    assert cache.is_fresh(entry)
+    assert entry.validators() == {"If-None-Match": '"v1"'}
+    # The query headers are part of the key.
+    assert cache.lookup(URL, {"X-Alaska-Legislature-Basis-Query": "votes"}) is None
+    assert (cache.n_hits, cache.n_misses) == (1, 2)
+
+
+def _fetch_twice(cache: _cache.ResponseCache, handler, fetch=None) -> list:
+    if fetch is None:
+        fetch = functools.partial(_http.fetch, parse=bytes)
+
+    async def main():
+        async with _http.client_pool(cache=cache) as pool:
+            await pool._client.aclose()
+            pool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            return [await fetch(URL, headers=HEADERS) for _ in "ab"]
+
+    return asyncio.run(main())
+
+
+def test_fetch_serves_fresh_entries_without_asking(tmp_path):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return _response(b"body")
+
+    assert _fetch_twice(_cache.ResponseCache(tmp_path), handler) == [b"body"] * 2
+    assert len(requests) == 1
+
+
+def test_fetch_revalidates_stale_entries(tmp_path):
+    cache = _cache.ResponseCache(tmp_path, ttls={"bills": 0})
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return _response(b"body", ETag='"v1"')
+
+    assert _fetch_twice(cache, handler) == [b"body"] * 2
+    assert "If-None-Match" not in requests[0].headers
+    assert requests[1].headers["If-None-Match"] == '"v1"'
+    assert cache.n_revalidated == 1
+
+
+@pytest.mark.parametrize(
+    "content_type, body",
+    [
+        ("text/plain; charset=iso-8859-1", "Café".encode("latin-1")),
+        ("text/plain", "Café".encode()),
+    ],
+)
+def test_fetch_text_decodes_with_the_response_encoding(tmp_path, content_type, body):
+    # Stale straight away, so the second time is revalidated and read from the cache.
+    cache = _cache.ResponseCache(tmp_path, ttls={"bills": 0})
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("If-None-Match"):
+            return httpx.Response(304)
+        return _response(body, ETag='"v1"', **{"Content-Type": content_type})
+
+    assert _fetch_twice(cache, handler, fetch=_http.fetch_text) == ["Café"] * 2
+
+
+def test_prune_removes_unused_entries_and_their_bodies(tmp_path):
+    cache = _cache.ResponseCache(tmp_path, max_unused=30 * 24 * 60 * 60)
+    old = cache.store(URL, HEADERS, _response(b"old"))
+    cache.store(URL, {}, _response(b"new"))
+    # Shares its body with the old one, so keeps it alive.
+    cache.store(URL + "&x", HEADERS, _response(b"shared"))
+    cache.store(URL + "&y", HEADERS, _response(b"shared"))
+    _age(cache._entry_path(old.key), days=31)
+    _age(cache._entry_path(cache.lookup(URL + "&x", HEADERS).key), days=31)
+    crashed = tmp_path / "bodies" / "ab" / "abc.gz.123.tmp"
+    crashed.parent.mkdir(parents=True, exist_ok=True)
+    crashed.write_bytes(b"")
+    _age(crashed, days=1)
+
+    assert cache.prune() == (2, 1)
+    assert cache.lookup(URL, HEADERS) is None
+    assert cache.read(cache.lookup(URL, {})) == b"new"
+    assert cache.read(cache.lookup(URL + "&y", HEADERS)) == b"shared"
+    assert not crashed.exists()
+
+
+def test_lookup_counts_as_use(tmp_path):
+    cache = _cache.ResponseCache(tmp_path)
+    entry = cache.store(URL, HEADERS, _response(b"body"))
+    _age(cache._entry_path(entry.key), days=31)
+    cache.lookup(URL, HEADERS)
+    assert cache.prune() == (0, 0)
+
+
+def test_prune_keeps_the_most_recently_used_within_max_bytes(tmp_path):
+    cache = _cache.ResponseCache(tmp_path)
+    for i, days in enumerate([3, 1, 2]):
+        entry = cache.store(f"{URL}&{i}", HEADERS, _response(os.urandom(1000)))
+        _age(cache._entry_path(entry.key), days=days)
+    cache.max_bytes = 2500
+    assert cache.prune() == (1, 1)
+    assert cache.lookup(f"{URL}&0", HEADERS) is None
+    assert cache.lookup(f"{URL}&1", HEADERS) is not None
+    assert cache.lookup(f"{URL}&2", HEADERS) is not None
+
+
+def test_max_bytes_from_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("AK_LEG_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("AK_LEG_CACHE_MAX_BYTES", "1000000")
+    assert _cache.ResponseCache.from_env().max_bytes == 1_000_000
+
+
+@pytest.mark.parametrize("days_ago, pruned", [(2, True), (0.5, False)])
+def test_prune_daily(tmp_path, days_ago, pruned):
+    cache = _cache.ResponseCache(tmp_path, max_unused=0)
+    cache.store(URL, HEADERS, _response(b"body"))
+    (tmp_path / "last-pruned").touch()
+    _age(tmp_path / "last-pruned", days=days_ago)
+    cache.prune_daily()
+    assert (cache.lookup(URL, HEADERS) is None) == pruned
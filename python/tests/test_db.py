@@ -0,0 +1,190 @@
+import os
+
+import ibis
+import pytest
+
+from alaska_legislative_data import _db
+
+
+def test_foreign_keys_use_the_table_names_in_the_database():
+    fks = {str(fk) for fk in _db.foreign_keys()}
+    assert "billVersions(BillId) -> bills(BillId)" in fks
+    assert "choices(VoteId) -> votes(VoteId)" in fks
+
+
+def test_check_references_ignores_tables_ingest_doesnt_fill(db: _db.Backend):
+    db.raw_sql("DELETE FROM legislatures")
+    bills = ibis.memtable({"BillId": ["35:HB 1"], "LegislatureNumber": [35]})
+    _db.check_references(db, {"bills": bills})
+
+
+def test_check_references_finds_missing_rows(db: _db.Backend):
+    votes = ibis.memtable(
+        {"VoteId": ["34:H:1", "34:H:2"], "BillId": ["34:HB 1", None]},
+        schema={"VoteId": "string", "BillId": "string"},
+    )
+    choices = ibis.memtable(
+        {
+            "ChoiceId": ["34:H:1:x", "34:H:3:x"],
+            "VoteId": ["34:H:1", "34:H:3"],
+            "MemberId": ["34:H:1:x", "34:H:1:x"],
+        }
+    )
+    with pytest.raises(ValueError) as e:
+        _db.check_references(db, {"votes": votes, "choices": choices})
+    message = str(e.value)
+    assert "votes(BillId) -> bills(BillId): 1 rows, eg ['34:HB 1']" in message
+    # 34:H:1 is in the new votes, so only 34:H:3 is missing.
+    assert "choices(VoteId) -> votes(VoteId): 1 rows, eg ['34:H:3']" in message
+    assert "choices(MemberId) -> members(MemberId): 2 rows" in message
+
+
+@pytest.mark.skipif(
+    not os.environ.get("DATABASE_URL"), reason="needs DATABASE_URL to compare with"
+)
+def test_ddl_matches_the_live_database():
+    """`DDL` is the source of truth for `check_references`, so keep it honest.
+
+    Postgres and DuckDB don't name types the same way, so only compare the columns.
+    """
+
+    def columns(backend) -> dict[str, set[str]]:
+        return {
+            table.lower(): {c.lower() for c in schema}
+            for table, schema in _db.get_db_structure(backend).items()
+        }
+
+    expected = ibis.duckdb.connect()
+    expected.con.execute(_db.DDL)
+    expected = columns(expected)
+    live = columns(_db.get_db())
+    assert {t: live.get(t) for t in expected} == expected
+
+
+def test_migrate_adds_missing_columns():
+    # eg a mirror made before BillActions was added.
+    db = _db.Backend(ibis.duckdb.connect(), check_structure=False)
+    db.raw_sql("CREATE TABLE bills (BillId VARCHAR, LegislatureNumber SMALLINT)")
+    assert "BillActions" not in db.Bill.columns
+    _db.migrate(db)
+    assert "BillActions" in db.Bill.columns
+    # Running it again does nothing.
+    _db.migrate(db)
+
+
+def _people(*rows) -> ibis.Table:
+    return ibis.memtable(
+        [
+            {
+                "PersonId": id,
+                "FullName": f"{first} {last}",
+                "FirstName": first,
+                "LastName": last,
+            }
+            for id, first, last in rows
+        ]
+    )
+
+
+def _rows(db: _db.Backend, table_name: str, key: str) -> list[dict]:
+    return db.table(table_name).order_by(key).to_pyarrow().to_pylist()
+
+
+@pytest.mark.parametrize("backend", ["db", "postgres"])
+def test_upsert_only_writes_new_and_changed_rows(backend, request):
+    db = request.getfixturevalue(backend)
+    people = _people(("1:a", "Ann", "O'Hara"), ("2:b", "Bo", "Li"))
+    first = _db.upsert(db, "people", people, key="PersonId")
+    assert first == _db.ChangeSummary(inserted=2)
+    second = _db.upsert(
+        db,
+        "people",
+        _people(("1:a", "Ann", "O'Hara"), ("2:b", "Bob", "Li"), ("3:c", "Cy", "Ng")),
+        key="PersonId",
+    )
+    assert second == _db.ChangeSummary(inserted=1, updated=1, unchanged=1)
+    assert [
+        (r["PersonId"], r["FirstName"], r["LastName"])
+        for r in _rows(db, "people", "PersonId")
+    ] == [("1:a", "Ann", "O'Hara"), ("2:b", "Bob", "Li"), ("3:c", "Cy", "Ng")]
+
+
+def _votes(*numbers) -> ibis.Table:
+    return ibis.memtable(
+        [
+            {
+                "VoteId": f"34:H:{n}",
+                "LegislatureNumber": 34,
+                "VoteChamber": "H",
+                "VoteNumber": n,
+                "VoteTitle": "HB 1",
+            }
+            for n in numbers
+        ]
+    )
+
+
+@pytest.mark.parametrize("backend", ["db", "postgres"])
+def test_upsert_fills_defaults_only_on_insert(backend, request):
+    db = request.getfixturevalue(backend)
+    defaults = {"VoteDescription": "it's new"}
+    _db.upsert(db, "votes", _votes(1), key="VoteId", defaults=defaults)
+    db.raw_sql("UPDATE votes SET VoteDescription = 'Passed'")
+    _db.upsert(db, "votes", _votes(1, 2), key="VoteId", defaults=defaults)
+    assert [r["VoteDescription"] for r in _rows(db, "votes", "VoteId")] == [
+        "Passed",
+        "it's new",
+    ]
+
+
+def test_upsert_writes_to_the_mirror_too(db: _db.Backend):
+    db.raw_sql("ATTACH ':memory:' AS mirror")
+    db.raw_sql("CREATE TABLE mirror.people AS SELECT * FROM people LIMIT 0")
+    db.mirror_catalog = "mirror"
+    _db.upsert(db, "people", _people(("1:a", "Ann", "Ho")), key="PersonId")
+    _db.upsert(db, "people", _people(("1:a", "Ann", "Hu")), key="PersonId")
+    assert db.raw_sql("SELECT PersonId, LastName FROM mirror.people").fetchall() == [
+        ("1:a", "Hu")
+    ]
+
+
+@pytest.mark.parametrize("backend", ["db", "postgres"])
+def test_failed_upsert_changes_nothing(backend, request):
+    db = request.getfixturevalue(backend)
+    _db.upsert(db, "people", _people(("1:a", "Ann", "Ho")), key="PersonId")
+    people = _people(("1:a", "Ann", "Hu"), ("2:b", "Bo", None))
+    with pytest.raises(Exception, match="(?i)null"):
+        _db.upsert(db, "people", people, key="PersonId")
+    # The update of 1:a was rolled back, and the connection still works.
+    assert [r["LastName"] for r in _rows(db, "people", "PersonId")] == ["Ho"]
+
+
+def test_sync_mirror_only_fetches_changed_rows(postgres: _db.Backend, tmp_path):
+    people = _people(("1:a", "Ann", "Ho"), ("2:b", "Bo", "Li"), ("3:c", "Cy", "Ng"))
+    _db.upsert(postgres, "people", people, key="PersonId")
+    tables = {"people": "PersonId"}
+    _db.attach_mirror(postgres, tmp_path / "mirror.duckdb", sync=False)
+    assert _db.sync_mirror(postgres, tables=tables) == {"people": 3}
+    assert _db.sync_mirror(postgres, tables=tables) == {"people": 0}
+
+    # Someone else changes Postgres behind our back.
+    source, _ = _db._postgres_names(postgres, "people", [])
+    _db._postgres_execute(
+        postgres,
+        f"""UPDATE {source} SET "LastName" = 'O''Hara' WHERE "PersonId" = '2:b';"""
+        f"""INSERT INTO {source} VALUES ('4:d', 'Di Wu', 'Di', 'Wu')""",
+    )
+    assert _db.sync_mirror(postgres, tables=tables) == {"people": 2}
+    mirrored = postgres.raw_sql(
+        'SELECT "PersonId", "LastName" FROM mirror.people ORDER BY 1'
+    ).fetchall()
+    assert mirrored == [("1:a", "Ho"), ("2:b", "O'Hara"), ("3:c", "Ng"), ("4:d", "Wu")]
+
+    # Deletions can't be seen from xmin, so the whole table is fetched again.
+    delete = f"""DELETE FROM {source} WHERE "PersonId" = '1:a'"""
+    _db._postgres_execute(postgres, delete)
+    assert _db.sync_mirror(postgres, tables=tables) == {"people": 3}
+    mirrored = postgres.raw_sql(
+        'SELECT "PersonId" FROM mirror.people ORDER BY 1'
+    ).fetchall()
+    assert mirrored == [("2:b",), ("3:c",), ("4:d",)]
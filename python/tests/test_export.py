@@ -0,0 +1,42 @@
+import duckdb
+
+from alaska_legislative_data import _db, _export
+
+
+def test_to_parquet_partitions_sorted_by_key(db: _db.Backend, tmp_path):
+    # Inserted out of order, and many more than one thread's worth of rows.
+    db.raw_sql(
+        "INSERT INTO votes (VoteId, LegislatureNumber, VoteChamber, VoteNumber, "
+        "VoteTitle) "
+        "SELECT leg || ':H:' || lpad(n::VARCHAR, 6, '0'), leg, 'H', n % 60000, 'x' "
+        "FROM range(33, 35) AS l(leg), range(200000) AS t(n) "
+        "ORDER BY hash(n)"
+    )
+    # Unsorted output only shows up with several threads.
+    db.raw_sql("SET threads = 8")
+    _export.to_parquet(db, tmp_path)
+
+    votes = tmp_path / "votes"
+    assert sorted(p.relative_to(votes).as_posix() for p in votes.rglob("*")) == [
+        "LegislatureNumber=33",
+        "LegislatureNumber=33/data_0.parquet",
+        "LegislatureNumber=34",
+        "LegislatureNumber=34/data_0.parquet",
+    ]
+    # The other partitioned tables are empty, so have no partitions.
+    assert list((tmp_path / "choices").iterdir()) == []
+    assert (tmp_path / "people.parquet").exists()
+
+    for leg_num in (33, 34):
+        path = votes / f"LegislatureNumber={leg_num}" / "data_0.parquet"
+        ids = duckdb.sql(f"SELECT VoteId FROM '{path}'").fetchnumpy()["VoteId"]
+        assert list(ids) == sorted(ids)
+        assert len(ids) == 200000
+
+    counts = duckdb.sql(
+        f"SELECT LegislatureNumber, count(*) AS n, count(DISTINCT VoteId) AS n_ids "
+        f"FROM read_parquet('{votes}/*/*.parquet', hive_partitioning = true) "
+        f"WHERE VoteId LIKE LegislatureNumber || ':%' "
+        f"GROUP BY LegislatureNumber ORDER BY LegislatureNumber"
+    ).fetchall()
+    assert counts == [(33, 200000, 200000), (34, 200000, 200000)]
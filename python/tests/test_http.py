@@ -0,0 +1,138 @@
+import asyncio
+import types
+
+import httpx
+import pytest
+
+from alaska_legislative_data import _http
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(_http, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def test_fast_requests_widen_the_limit(clock):
+    limiter = _http.AdaptiveLimiter(initial=2, maximum=3)
+    for _ in range(4):
+        limiter._on_success(0.1)
+    assert limiter.limit == pytest.approx(3)
+    for _ in range(100):
+        limiter._on_success(0.1)
+    assert limiter.limit == 3
+
+
+def test_slow_requests_shrink_the_limit_once_per_window(clock):
+    limiter = _http.AdaptiveLimiter(initial=10, target_latency=5)
+    # A burst of requests that were all slow together.
+    for _ in range(10):
+        limiter._on_success(6)
+    assert limiter.limit == pytest.approx(9)
+    clock.now += 5
+    limiter._on_success(6)
+    assert limiter.limit == pytest.approx(8.1)
+
+
+def test_overloads_halve_the_limit_once_per_window(clock):
+    limiter = _http.AdaptiveLimiter(initial=8, minimum=1, target_latency=5)
+    for _ in range(5):
+        limiter._on_overload()
+    assert limiter.limit == 4
+    clock.now += 5
+    limiter._on_overload()
+    limiter._on_overload()
+    assert limiter.limit == 2
+    assert limiter.n_overloads == 7
+    for _ in range(3):
+        clock.now += 5
+        limiter._on_overload()
+    assert limiter.limit == 1
+
+
+def test_slot_counts_overload_errors():
+    class Overloaded(Exception):
+        pass
+
+    async def main():
+        limiter = _http.AdaptiveLimiter(initial=4)
+        with pytest.raises(Overloaded):
+            async with limiter.slot(overload_errors=(Overloaded,)):
+                raise Overloaded
+        with pytest.raises(ValueError):
+            async with limiter.slot(overload_errors=(Overloaded,)):
+                raise ValueError
+        async with limiter.slot():
+            pass
+        return limiter
+
+    limiter = asyncio.run(main())
+    assert limiter.n_overloads == 1
+    assert limiter.n_successes == 1
+    assert limiter.in_flight == 0
+    assert limiter.limit == pytest.approx(2.5)
+
+
+def test_slot_waits_for_the_limit():
+    async def main():
+        limiter = _http.AdaptiveLimiter(initial=2, maximum=2, max_rate=1000)
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(request() for _ in range(6)))
+        return peak
+
+    assert asyncio.run(main()) == 2
+
+
+def test_server_errors_are_overloads():
+    request = httpx.Request("GET", "https://www.akleg.gov")
+    error = httpx.HTTPStatusError(
+        "", request=request, response=httpx.Response(503, request=request)
+    )
+    assert _http._is_overload(error, ())
+    not_found = httpx.HTTPStatusError(
+        "", request=request, response=httpx.Response(404, request=request)
+    )
+    assert not _http._is_overload(not_found, ())
+
+
+def test_pool_counts_and_reports_connection_reuse(caplog):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/first":
+            # What httpcore reports when it opens a new connection.
+            trace = request.extensions["trace"]
+            await trace("connection.connect_tcp.complete", {})
+        return httpx.Response(200)
+
+    async def main() -> _http.PoolStats:
+        async with _http.ClientPool(cache=False) as pool:
+            await pool._client.aclose()
+            pool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            for path in ["first", "second", "third"]:
+                await pool.get(f"https://www.akleg.gov/{path}")
+        return pool.stats
+
+    with caplog.at_level("INFO", logger=_http.__name__):
+        stats = asyncio.run(main())
+    assert stats == _http.PoolStats(
+        requests=3, connections_opened=1, connections_reused=2
+    )
+    assert (
+        "Made 3 requests, opened 1 connections, reused a connection 2 times"
+        in caplog.text
+    )
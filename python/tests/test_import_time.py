@@ -0,0 +1,56 @@
+"""Guard against imports getting slower.
+
+Rather than timing thresholds, which are flaky, check which modules get imported.
+See `benchmarks/bench_import.py` for the actual times, from `python -X importtime`.
+"""
+
+import json
+import subprocess
+import sys
+
+
+def _imported_modules(code: str) -> set[str]:
+    """The modules imported by running `code` in a fresh interpreter."""
+    code += "\nimport sys, json; print(json.dumps(list(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+def test_export_doesnt_import_scraping_code():
+    modules = _imported_modules(
+        "from alaska_legislative_data import __main__; "
+        "__main__._load_commands(['export'])"
+    )
+    assert "alaska_legislative_data._export" in modules
+    assert "httpx" not in modules
+    assert "alaska_legislative_data._scrape" not in modules
+    assert "alaska_legislative_data._ingest" not in modules
+
+
+def test_ingest_doesnt_import_export_code():
+    modules = _imported_modules(
+        "from alaska_legislative_data import __main__; "
+        "__main__._load_commands(['ingest'])"
+    )
+    assert "alaska_legislative_data._ingest" in modules
+    assert "alaska_legislative_data._export" not in modules
+
+
+def test_importing_parse_doesnt_run_queries():
+    # Running any ibis expression would create the default backend.
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            (
+                "import ibis; from alaska_legislative_data import _parse, _util; "
+                "assert ibis.options.default_backend is None"
+            ),
+        ],
+        check=True,
+    )
@@ -0,0 +1,445 @@
+import asyncio
+import datetime
+import json
+import time
+import types
+
+import httpx
+import ibis
+import pyarrow as pa
+
+from alaska_legislative_data import (
+    _cache,
+    _db,
+    _http,
+    _ingest,
+    _low,
+    _parse,
+    _scrape,
+    _spool,
+)
+
+
+def _raw_bill(leg_num: int, bill_number: str, **fields) -> dict:
+    """A bill like `_scrape.scrape_bills_of_legislature` returns."""
+    return {
+        "LegislatureNumber": leg_num,
+        "BillNumber": bill_number,
+        "BillName": bill_number,
+        "Documents": [],
+        "PartialVeto": False,
+        "Vetoed": False,
+        "ShortTitle": "A TITLE",
+        "StatusCode": "002",
+        "StatusText": "(H) STA",
+        "Flag1": "H",
+        "Flag2": "1",
+        "StatusDate": "2025-01-22",
+        "StatusAndThen": [],
+        "StatusSummaryCode": " ",
+        "OnFloor": " ",
+        "Filler": " ",
+        "Lock": " ",
+        "AllMeetings": [],
+        "Meetings": [],
+        "Subjects": ["FISH"],
+        "ManifestErrors": [],
+        "Statutes": [],
+        "CurrentCommittee": None,
+        "Actions": [],
+        **fields,
+    }
+
+
+def test_ingest_bills_stores_actions(db: _db.Backend):
+    action = {"Date": "2025-01-22", "Action": "READ THE FIRST TIME - REFERRALS"}
+    raw = ibis.memtable([_raw_bill(34, "HB  1", Actions=[action])])
+    _ingest.ingest_bills(db, new_bills=_parse.clean_bills(raw))
+    [row] = db.Bill.select("BillId", "BillActions").to_pyarrow().to_pylist()
+    assert row["BillId"] == "34:HB 1"
+    assert [json.loads(a) for a in row["BillActions"]] == [action]
+
+
+def _votes(*rows: tuple[str, str]) -> ibis.Table:
+    """Votes of the 34th House with these (VoteId, VoteTitle)s."""
+    schema = _db.VoteSchema.ibis_schema()
+    schema = ibis.schema({c: t for c, t in schema.items() if c != "VoteDescription"})
+    rows = pa.Table.from_pylist(
+        [
+            {
+                "VoteId": vote_id,
+                "LegislatureNumber": 34,
+                "VoteChamber": "H",
+                "VoteNumber": int(vote_id.split(":")[-1]),
+                "VoteDate": None,
+                "VoteTitle": title,
+                "BillId": None,
+                "VoteBillAmendmentNumber": None,
+            }
+            for vote_id, title in rows
+        ],
+        schema=schema.to_pyarrow(),
+    )
+    return ibis.memtable(rows)
+
+
+def test_reingesting_votes_keeps_their_descriptions(db: _db.Backend):
+    no_choices = _db.ChoiceSchema.ibis_schema()
+    no_choices = ibis.memtable({c: [] for c in no_choices}, schema=no_choices)
+    _ingest._insert_votes_and_choices(
+        db, votes=_votes(("34:H:1", "Old title")), choices=no_choices
+    )
+    db.raw_sql("UPDATE votes SET VoteDescription = 'Confirmed'")
+
+    _ingest._insert_votes_and_choices(
+        db,
+        votes=_votes(("34:H:1", "New title"), ("34:H:2", "Another")),
+        choices=no_choices,
+    )
+    rows = db.Vote.order_by("VoteId").select("VoteTitle", "VoteDescription")
+    assert rows.to_pyarrow().to_pylist() == [
+        {"VoteTitle": "New title", "VoteDescription": "Confirmed"},
+        {"VoteTitle": "Another", "VoteDescription": ""},
+    ]
+
+
+def _fake_scrapers(monkeypatch, *, slow_after: int) -> list[str]:
+    """Stand in for the API, with 19 bills in each of the 28th to 32nd legislatures.
+
+    The first `slow_after` bills' versions come back right away,
+    the next one takes an hour, as far as `_scrape`'s clock is concerned.
+    Returns the BillIds whose versions were scraped, as they are.
+    """
+    scraped = []
+
+    async def scrape_bills_of_legislature(leg_num):
+        if not 28 <= leg_num <= 32:
+            return []
+        return [_raw_bill(leg_num, f"HB {i}") for i in range(1, 20)]
+
+    async def scrape_bill_versions(leg_num, bill_number, version_letters=None):
+        scraped.append(f"{leg_num}:{bill_number}")
+        if len(scraped) == slow_after + 1:
+            later = types.SimpleNamespace(monotonic=lambda: time.monotonic() + 3600)
+            monkeypatch.setattr(_scrape, "time", later)
+            await asyncio.sleep(0.01)
+        return [
+            {
+                "BillVersionId": f"{leg_num}:{bill_number}:A",
+                "BillId": f"{leg_num}:{bill_number}",
+                "BillVersionLetter": "A",
+                "BillVersionTitle": "A TITLE",
+                "BillVersionName": bill_number,
+                "BillVersionIntroDate": datetime.date(2020, 1, 21),
+                "BillVersionWorkOrder": "1",
+                "BillVersionPdfUrl": "https://example.com/a.pdf",
+            }
+        ]
+
+    async def nothing(*args, **kwargs):
+        return []
+
+    monkeypatch.setattr(_ingest, "ingest_people", lambda db, **kwargs: None)
+    monkeypatch.setattr(_ingest, "ingest_members", lambda db, **kwargs: None)
+    monkeypatch.setattr(_ingest, "_ingest_votes_and_choices_async", nothing)
+    monkeypatch.setattr(
+        _scrape, "scrape_bills_of_legislature", scrape_bills_of_legislature
+    )
+    monkeypatch.setattr(_scrape, "scrape_bill_versions", scrape_bill_versions)
+    monkeypatch.setattr(_scrape, "scrape_bill_version_listings_async", nothing)
+    return scraped
+
+
+def test_no_time_left_defers_everything(db: _db.Backend, monkeypatch):
+    scraped = _fake_scrapers(monkeypatch, slow_after=1000)
+    asyncio.run(_ingest.ingest_all_async(db, time_budget=0))
+    assert db.Bill.count().execute() == 0
+    assert scraped == []
+
+
+def test_running_out_of_time_saves_what_was_scraped(db: _db.Backend, monkeypatch):
+    scraped = _fake_scrapers(monkeypatch, slow_after=25)
+    asyncio.run(_ingest.ingest_all_async(db, time_budget=3600))
+    # The bills were all scraped before the deadline.
+    assert db.Bill.count().execute() == 5 * 19
+    # The 28th to 31st legislatures' 76 bills need versions. Some were scraped,
+    # including the one that was in flight at the deadline, and all of those
+    # were saved. The rest were deferred, for the next run.
+    assert 25 < len(scraped) < 4 * 19
+    assert sorted(db.BillVersion.BillId.to_pyarrow().to_pylist()) == sorted(scraped)
+
+
+def test_votes_to_scrape_judges_members_by_their_own_tenure(db: _db.Backend):
+    db.raw_sql(
+        "INSERT INTO people (PersonId, FullName, FirstName, LastName) "
+        "SELECT 'p:' || n, 'X', 'X', 'X' FROM range(1, 5) AS t(n)"
+    )
+    members = {"AAA": 1, "BBB": 2, "CCC": 3, "DDD": 4}
+    db.raw_sql(
+        "INSERT INTO members "
+        "(MemberId, LegislatureNumber, PersonId, MemberCode, Chamber, District) "
+        "VALUES "
+        + ", ".join(
+            f"('{leg}:H:{n}:p:{n}', {leg}, 'p:{n}', '{code}', 'H', '{n}')"
+            for leg in (33, 34)
+            for code, n in members.items()
+        )
+    )
+    db.raw_sql(
+        "INSERT INTO votes (VoteId, LegislatureNumber, VoteChamber, VoteNumber, "
+        "VoteTitle) VALUES "
+        + ", ".join(f"('33:H:{n}', 33, 'H', {n}, 'x')" for n in range(1, 6))
+        + ", ('34:H:1', 34, 'H', 1, 'x')"
+    )
+    choices = {
+        # All 5 votes.
+        "33:H:1:p:1": [1, 2, 3, 4, 5],
+        # Only joined in time for the 3rd vote, but has all of them since.
+        "33:H:2:p:2": [3, 4, 5],
+        # Missing one in the middle.
+        "33:H:3:p:3": [1, 2, 4, 5],
+        # None at all, so 33:H:4:p:4 is missing.
+        "34:H:1:p:1": [1],
+    }
+    db.raw_sql(
+        "INSERT INTO choices VALUES "
+        + ", ".join(
+            f"('{member}:{n}', '{member[:5]}{n}', '{member}', 'Y')"
+            for member, numbers in choices.items()
+            for n in numbers
+        )
+    )
+    plan = _ingest._votes_to_scrape(db)
+    assert {k: v for k, v in plan.items() if k[0] == 33} == {
+        (33, "CCC"): None,
+        (33, "DDD"): None,
+    }
+    # The latest legislature is always checked for new votes.
+    assert plan[(34, "AAA")] == 1
+    assert plan[(34, "BBB")] is None
+
+
+def _check_chambers(db: _db.Backend, tmp_path, journals: list) -> list[str]:
+    """Run `_quiet_chambers()`, with BASIS answering with these `journals`.
+
+    The cache already has a fresh answer of no journals.
+    Returns the URLs of the requests that reached the server.
+    """
+    db.raw_sql(
+        "INSERT INTO votes (VoteId, LegislatureNumber, VoteChamber, VoteNumber, "
+        "VoteDate, VoteTitle) VALUES ('34:H:1', 34, 'H', 1, '2025-03-03', 'x')"
+    )
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(str(request.url))
+        return httpx.Response(200, json={"Basis": {"Session": {"Journals": journals}}})
+
+    async def main():
+        cache = _cache.ResponseCache(tmp_path)
+        async with _http.client_pool(cache=cache) as pool:
+            await pool._client.aclose()
+            pool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            url, headers = _low._build_request(
+                "sessions",
+                queries=["Journals;chamber=H;startdate=2025-03-04"],
+                session=34,
+            )
+            empty = {"Basis": {"Session": {"Journals": []}}}
+            cache.store(url, headers, httpx.Response(200, json=empty))
+            return await _ingest._quiet_chambers(db)
+
+    assert asyncio.run(main()) == []
+    return requested
+
+
+def test_cached_answer_doesnt_make_a_chamber_quiet(db: _db.Backend, tmp_path):
+    requested = _check_chambers(db, tmp_path, journals=[{"JournalDate": "x"}])
+    assert len(requested) == 1
+
+
+def test_no_journals_doesnt_make_a_chamber_quiet(db: _db.Backend, tmp_path):
+    # Maybe BASIS ignored a startdate= it didn't understand.
+    requested = _check_chambers(db, tmp_path, journals=[])
+    assert len(requested) == 1
+
+
+def _listed_version(letter: str, **fields) -> dict:
+    """A version like the listing of a legislature's bill versions has."""
+    return {
+        "VersionLetter": letter,
+        "Title": "A TITLE",
+        "Name": f"HB 1 {letter}",
+        "IntroDate": "2025-01-22",
+        "PassedHouse": None,
+        "PassedSenate": None,
+        "WorkOrder": "34-LS0001\\A",
+        "Url": f"https://example.com/{letter}.pdf",
+        **fields,
+    }
+
+
+def _ingest_listed_versions(db: _db.Backend, monkeypatch, versions: list[dict]):
+    """Ingest the versions of 34:HB 1, as listed, after we've stored version A.
+
+    Returns the letters whose text was downloaded.
+    """
+    downloaded = []
+
+    async def listings(leg_nums):
+        return [{"BillNumber": "HB   1", "Versions": versions}]
+
+    async def get_text(*, legislature_number, bill_number, version_letter):
+        downloaded.append(version_letter)
+        return f"text of {version_letter}"
+
+    async def no_details(*args, **kwargs):
+        raise AssertionError("The listing should be enough")
+
+    monkeypatch.setattr(_scrape, "scrape_bill_version_listings_async", listings)
+    monkeypatch.setattr(_scrape, "scrape_bill_details", no_details)
+    monkeypatch.setattr(_scrape, "scrape_bill_details_batch", no_details)
+    monkeypatch.setattr(_scrape._bill_version_text, "get_bill_version_text", get_text)
+    _ingest.ingest_bills(
+        db, new_bills=_parse.clean_bills(ibis.memtable([_raw_bill(34, "HB 1")]))
+    )
+    stored = asyncio.run(
+        _scrape._prep_bill_versions(
+            34, {"BillNumber": "HB 1", "Versions": [_listed_version("A")]}
+        )
+    )
+    _ingest._insert_bill_versions(db, stored)
+    downloaded.clear()
+
+    changes = asyncio.run(_ingest.ingest_bill_versions_async(db=db))
+    return downloaded, changes
+
+
+def _stored_versions(db: _db.Backend) -> list[tuple]:
+    t = db.BillVersion.order_by("BillVersionId")
+    t = t.select("BillVersionLetter", "BillVersionPassedHouse", "BillVersionFullText")
+    return [tuple(row.values()) for row in t.to_pyarrow().to_pylist()]
+
+
+def test_new_version_letters_are_scraped(db: _db.Backend, monkeypatch):
+    versions = [_listed_version("A"), _listed_version("B")]
+    downloaded, changes = _ingest_listed_versions(db, monkeypatch, versions)
+    assert downloaded == ["B"]
+    assert (changes.inserted, changes.updated) == (1, 0)
+    assert _stored_versions(db) == [
+        ("A", None, "text of A"),
+        ("B", None, "text of B"),
+    ]
+
+
+def test_new_pass_dates_update_a_version(db: _db.Backend, monkeypatch):
+    versions = [_listed_version("A", PassedHouse="2025-03-04")]
+    downloaded, changes = _ingest_listed_versions(db, monkeypatch, versions)
+    assert downloaded == []
+    assert (changes.inserted, changes.updated) == (0, 1)
+    # The text we have is kept.
+    assert _stored_versions(db) == [("A", datetime.date(2025, 3, 4), "text of A")]
+
+
+def test_unchanged_versions_are_left_alone(db: _db.Backend, monkeypatch):
+    downloaded, changes = _ingest_listed_versions(
+        db, monkeypatch, [_listed_version("A")]
+    )
+    assert downloaded == []
+    assert changes == _db.ChangeSummary()
+    assert _stored_versions(db) == [("A", None, "text of A")]
+
+
+def _member_votes(member: str, *votes: tuple[str | None, str]) -> list[dict]:
+    """A member's votes like `_scrape._scrape_votes_of` returns, as (VoteNum, Vote)s."""
+    return [
+        {
+            "LegislatureNumber": 34,
+            "VoteNum": num,
+            "VoteDate": "2025-03-03",
+            "Title": f"Vote {num}",
+            "Bill": "HB   1" if num else None,
+            "Member": member,
+            "Vote": vote,
+        }
+        for num, vote in votes
+    ]
+
+
+def _sorted_votes(votes: list[dict]) -> list[dict]:
+    return sorted(votes, key=lambda v: (v["Member"], v["VoteNum"] or ""))
+
+
+def test_compacted_votes_read_back_whole(db: _db.Backend, tmp_path):
+    by_member = {
+        "AAA": _member_votes("AAA", ("H0001", "Y"), ("H0002", "N"), (None, "Y")),
+        "BBB": _member_votes("BBB", ("H0001", "N"), ("H0002", "N")),
+    }
+    spool = _spool.Spool(tmp_path / "spool")
+    seen = set()
+    for member, votes in by_member.items():
+        records = _scrape._compact_votes(votes, seen)
+        spool.write(f"34:{member}", records)
+    # Each roll call's header was only written once.
+    records = [json.loads(line) for line in spool.records_path.open()]
+    assert sorted(r["VoteNum"] for r in records if "Member" not in r) == [
+        "H0001",
+        "H0002",
+    ]
+
+    read = _ingest._read_vote_spool(db, spool).to_pyarrow().to_pylist()
+    expected = [v for votes in by_member.values() for v in votes]
+    assert _sorted_votes(read) == _sorted_votes(expected)
+
+
+def test_half_finished_vote_spool_resumes(db: _db.Backend, tmp_path, monkeypatch):
+    by_member = {
+        "AAA": _member_votes("AAA", ("H0001", "Y"), ("H0002", "N")),
+        "BBB": _member_votes("BBB", ("H0001", "N"), ("H0002", "Y")),
+        "CCC": _member_votes("CCC", ("H0001", "Y"), (None, "Y")),
+    }
+    members = [(34, code) for code in by_member]
+    scraped = []
+
+    async def scrape_votes_of(leg_num, code):
+        if code == "CCC" and not scraped.count("CCC"):
+            scraped.append(code)
+            raise ConnectionError("The network went away")
+        scraped.append(code)
+        return by_member[code]
+
+    monkeypatch.setattr(_scrape, "_scrape_votes_of", scrape_votes_of)
+    spool = _spool.Spool(tmp_path / "spool")
+    try:
+        asyncio.run(
+            _scrape.scrape_votes_to_spool_async(
+                leg_num_and_member_codes=members, spool=spool, max_workers=1
+            )
+        )
+    except ConnectionError:
+        pass
+    # As if BBB's records were written, but it wasn't marked done before the crash.
+    lines = spool.done_path.read_text().splitlines()
+    assert lines == ['"34:AAA"', '"34:BBB"']
+    spool.done_path.write_text("".join(f"{line}\n" for line in lines[:-1]))
+
+    spool = _spool.Spool(tmp_path / "spool")
+    asyncio.run(
+        _scrape.scrape_votes_to_spool_async(
+            leg_num_and_member_codes=members, spool=spool, max_workers=1
+        )
+    )
+    assert scraped == ["AAA", "BBB", "CCC", "BBB", "CCC"]
+
+    choices = _parse.clean_choices(_ingest._read_vote_spool(db, spool))
+    read = choices.select("MemberCode", "VoteNum", "Choice").to_pyarrow().to_pylist()
+    expected = [
+        {"MemberCode": v["Member"], "VoteNum": v["VoteNum"], "Choice": v["Vote"]}
+        for votes in by_member.values()
+        for v in votes
+    ]
+
+    def key(v: dict) -> tuple:
+        return v["MemberCode"], v["VoteNum"] or ""
+
+    assert sorted(read, key=key) == sorted(expected, key=key)
@@ -0,0 +1,197 @@
+import asyncio
+import contextlib
+
+import httpx
+import pytest
+
+from alaska_legislative_data import _http, _low, _unavailable, _util
+
+
+def _counting_fetch(calls: list[str], key: str):
+    async def fetch() -> dict:
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return {"key": key}
+
+    return fetch
+
+
+def test_memo_coalesces_concurrent_requests():
+    memo = _low.RequestMemo()
+    calls: list[str] = []
+
+    async def main():
+        return await asyncio.gather(
+            *(memo.get("a", _counting_fetch(calls, "a")) for _ in range(5))
+        )
+
+    results = asyncio.run(main())
+    assert calls == ["a"]
+    assert all(r is results[0] for r in results)
+    assert (memo.n_misses, memo.n_coalesced, memo.n_hits) == (1, 4, 0)
+    # Without maxsize, nothing is kept afterwards.
+    asyncio.run(memo.get("a", _counting_fetch(calls, "a")))
+    assert calls == ["a", "a"]
+
+
+def test_memo_keeps_most_recent_results():
+    memo = _low.RequestMemo(maxsize=2)
+    calls: list[str] = []
+
+    async def main():
+        for key in ["a", "b", "a", "c", "b"]:
+            await memo.get(key, _counting_fetch(calls, key))
+
+    asyncio.run(main())
+    # "b" was evicted by "c", since "a" was used more recently.
+    assert calls == ["a", "b", "c", "b"]
+    assert (memo.n_misses, memo.n_hits) == (4, 1)
+
+
+def test_memo_shares_errors_without_keeping_them():
+    memo = _low.RequestMemo(maxsize=2)
+
+    async def fail() -> dict:
+        await asyncio.sleep(0.01)
+        raise _low.DataUnimplementedError("nope")
+
+    async def main():
+        return await asyncio.gather(
+            *(memo.get("a", fail) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, _low.DataUnimplementedError) for r in results)
+    assert memo.n_misses == 1
+    with pytest.raises(_low.DataUnimplementedError):
+        asyncio.run(memo.get("a", fail))
+    assert memo.n_misses == 2
+
+
+def test_memo_cancelling_one_caller_leaves_the_others():
+    memo = _low.RequestMemo()
+    calls: list[str] = []
+
+    async def main():
+        first = asyncio.create_task(memo.get("a", _counting_fetch(calls, "a")))
+        second = asyncio.create_task(memo.get("a", _counting_fetch(calls, "a")))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second, first
+
+    result, first = asyncio.run(main())
+    assert result == {"key": "a"}
+    assert first.cancelled()
+    assert calls == ["a"]
+
+
+def test_paginate_pages_one_after_another_if_count_fails(monkeypatch):
+    results = [{"n": i} for i in range(1, 251)]
+    ranges = []
+
+    async def count(*args, **kwargs):
+        raise RuntimeError("Failed 3 times")
+
+    async def make_request(endpoint, *, range, **kwargs):
+        ranges.append((range.start, range.stop))
+        return {"Bills": results[range.start - 1 : range.stop]}
+
+    monkeypatch.setattr(_low, "count", count)
+    monkeypatch.setattr(_low, "_make_request", make_request)
+
+    async def main():
+        return [page async for page in _low.paginate("bills", "Bills", page_size=100)]
+
+    pages = asyncio.run(main())
+    assert [len(p) for p in pages] == [100, 100, 50]
+    assert [r for p in pages for r in p] == results
+    assert ranges == [(1, 100), (101, 200), (201, 300)]
+
+
+def test_count_retries(monkeypatch):
+    monkeypatch.setattr(_http.asyncio, "sleep", _no_sleep)
+    responses = [
+        httpx.Response(503),
+        httpx.Response(200, headers={"X-Alaska-Query-Count": "1234"}),
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.method == "HEAD"
+        return responses.pop(0)
+
+    async def main():
+        async with _with_transport(httpx.MockTransport(handler)):
+            return await _low.count("bills", session=34)
+
+    assert asyncio.run(main()) == 1234
+    assert responses == []
+
+
+def test_known_failures_are_skipped_except_for_the_current_legislature(
+    monkeypatch, tmp_path
+):
+    registry = _unavailable.UnavailableRegistry(tmp_path / "unavailable.json")
+    monkeypatch.setattr(_unavailable, "default_registry", lambda: registry)
+    current = _util.current_leg_num_approx()
+
+    def request(session: int) -> dict:
+        return {"session": session, "chamber": None, "queries": []}
+
+    registry.record("members", **request(current - 2), kind="unimplemented")
+    registry.record("members", **request(current), kind="unimplemented")
+    # Only failed in one run so far, so it's tried again.
+    registry.record("members", **request(current - 4), kind="server_error")
+    requested = []
+
+    def handler(r: httpx.Request) -> httpx.Response:
+        requested.append(r.url.params["session"])
+        return httpx.Response(200, json={"Basis": {"Members": []}})
+
+    async def main():
+        async with _with_transport(httpx.MockTransport(handler)):
+            with pytest.raises(_low.DataUnimplementedError):
+                await _low._request("members", session=current - 2)
+            await _low._request("members", session=current)
+            await _low._request("members", session=current - 4)
+
+    asyncio.run(main())
+    assert requested == [str(current), str(current - 4)]
+    # It worked, so it's forgotten.
+    assert registry.lookup("members", **request(current - 4)) is None
+
+
+def test_server_error_after_every_retry(monkeypatch, tmp_path):
+    monkeypatch.setattr(_http.asyncio, "sleep", _no_sleep)
+    registry = _unavailable.UnavailableRegistry(tmp_path / "unavailable.json")
+    monkeypatch.setattr(_unavailable, "default_registry", lambda: registry)
+    session = _util.current_leg_num_approx() - 2
+    fault = "<Fault><Code>FaultException</Code></Fault>"
+
+    def handler(r: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text=fault)
+
+    async def main():
+        async with _with_transport(httpx.MockTransport(handler)):
+            await _low._request("members", session=session)
+
+    with pytest.raises(_low.ServerError) as info:
+        asyncio.run(main())
+    # A straight chain: ServerError <- RuntimeError <- the last ServerError
+    retries = info.value.__cause__
+    assert isinstance(retries, RuntimeError)
+    assert isinstance(retries.__cause__, _low.ServerError)
+    assert retries.__cause__ is not info.value
+    assert retries.__cause__.__cause__ is not retries
+
+
+async def _no_sleep(seconds: float) -> None:
+    pass
+
+
+@contextlib.asynccontextmanager
+async def _with_transport(transport: httpx.AsyncBaseTransport):
+    """Make every request through `transport` instead of the network."""
+    async with _http.client_pool(cache=False) as pool:
+        await pool._client.aclose()
+        pool._client = httpx.AsyncClient(transport=transport)
+        yield pool
@@ -0,0 +1,110 @@
+import datetime
+import zoneinfo
+
+import ibis
+import pandas as pd
+import pytest
+
+from alaska_legislative_data import _parse
+
+ALASKA = zoneinfo.ZoneInfo("America/Anchorage")
+
+
+@pytest.mark.parametrize(
+    "title,expected",
+    [
+        ("foo", None),
+        ("Amendment No. 1", 1.0),
+        ("Amendment No. 2", 2.0),
+        ("Amendment No. 1 to Amendment No. 3", 3.1),
+        ("Amendment No. 2 to Amendment No. 3", 3.2),
+        ("Amendment to Amendment No. 3", 3.1),
+    ],
+)
+def test_parse_amendment_numbers(title: str, expected: float | None):
+    result = _parse._parse_amendment_numbers(
+        ibis.literal(title, type="string")
+    ).execute()
+    # convert nan to None
+    if pd.isna(result):
+        result = None
+    if result is not None:
+        result = float(result)
+    assert result == expected
+
+
+def _epoch_date(d: datetime.date) -> str:
+    """Midnight in Alaska on `d`, as BASIS sends it, eg "/Date(726742800000)/"."""
+    midnight = datetime.datetime.combine(d, datetime.time(), ALASKA)
+    return f"/Date({int(midnight.timestamp() * 1000)})/"
+
+
+def _python_date(s: str) -> datetime.date:
+    """What the old python UDF did, on a machine in UTC (like our CI)."""
+    n_millis = int(s[6:-2])
+    return datetime.datetime.fromtimestamp(n_millis / 1000, datetime.UTC).date()
+
+
+@pytest.mark.parametrize(
+    "raw,expected",
+    [
+        ("/Date(726742800000)/", datetime.date(1993, 1, 11)),
+        ("/Date(0)/", datetime.date(1970, 1, 1)),
+        ("/Date(86399999)/", datetime.date(1970, 1, 1)),
+        ("/Date(-1)/", datetime.date(1969, 12, 31)),
+        ("garbage", None),
+    ],
+)
+def test_parse_epoch_date(raw: str, expected: datetime.date | None):
+    result = _parse._parse_epoch_date(ibis.literal(raw, type="string")).execute()
+    # convert NaT to None
+    if pd.isna(result):
+        result = None
+    if result is not None:
+        result = result.date()
+    assert result == expected
+
+
+def test_legislatures_and_sessions_every_legislature():
+    raw = []
+    expected = {}
+    for leg_num in range(1, 35):
+        year = 1959 + 2 * (leg_num - 1)
+        sessions = []
+        for code, start, end in [
+            ("10", datetime.date(year, 1, 15), datetime.date(year, 5, 16)),
+            ("11", datetime.date(year, 7, 8), datetime.date(year, 8, 6)),
+            ("20", datetime.date(year + 1, 1, 20), datetime.date(year + 1, 5, 15)),
+        ]:
+            session = {
+                "ID": code,
+                "Title": f" Session {code} ",
+                "StartDate": _epoch_date(start),
+                "EndDate": _epoch_date(end),
+            }
+            sessions.append(session)
+            expected[f"{leg_num}:{code}"] = (
+                _python_date(session["StartDate"]),
+                _python_date(session["EndDate"]),
+            )
+            assert expected[f"{leg_num}:{code}"] == (start, end)
+        raw.append(
+            {"LegislatureNumber": leg_num, "Year": str(year), "SessionDates": sessions}
+        )
+
+    legs, sessions = _parse.clean_and_split_legislatures_into_sessions(
+        ibis.memtable(raw)
+    )
+    legs = legs.to_pyarrow().to_pylist()
+    assert [leg["LegislatureNumber"] for leg in legs] == list(range(1, 35))
+    assert all(
+        leg["LegislatureEndYear"] == leg["LegislatureStartYear"] + 1 for leg in legs
+    )
+    result = {
+        s["LegislatureSessionId"]: (
+            s["LegislatureSessionStartDate"],
+            s["LegislatureSessionEndDate"],
+        )
+        for s in sessions.to_pyarrow().to_pylist()
+    }
+    assert result == expected
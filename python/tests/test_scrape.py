@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from alaska_legislative_data import _low, _scrape
+
+
+def _fake_bill_details(monkeypatch, pages: list) -> list[str]:
+    """Page through `pages` in the bulk scrape, and answer single bills.
+
+    An exception in `pages` is raised instead of yielding that page.
+    Returns the BillNumbers that were asked for one at a time.
+    """
+    asked = []
+
+    async def paginate(*args, **kwargs):
+        for page in pages:
+            if isinstance(page, Exception):
+                raise page
+            yield page
+
+    async def scrape_bill_details(leg_num, bill_number):
+        asked.append(bill_number)
+        return {"BillNumber": bill_number, "LegislatureNumber": leg_num}
+
+    monkeypatch.setattr(_low, "paginate", paginate)
+    monkeypatch.setattr(_scrape, "scrape_bill_details", scrape_bill_details)
+    return asked
+
+
+def test_bills_the_bulk_scrape_missed_are_fetched_one_at_a_time(monkeypatch):
+    pages = [
+        [{"BillNumber": "HB   1"}, {"BillNumber": "HB   2"}],
+        RuntimeError("Failed 3 times"),
+    ]
+    asked = _fake_bill_details(monkeypatch, pages)
+    wanted = ["HB 1", "HB 2", "HB 3", "SB 1"]
+    found = asyncio.run(_scrape.scrape_bill_details_batch(34, wanted))
+    assert sorted(found) == wanted
+    assert sorted(asked) == ["HB 3", "SB 1"]
+    assert found["HB 1"] == {"BillNumber": "HB   1", "LegislatureNumber": 34}
+
+
+def test_bills_are_fetched_one_at_a_time_if_the_bulk_scrape_fails(monkeypatch):
+    asked = _fake_bill_details(monkeypatch, [RuntimeError("Failed 3 times")])
+    found = asyncio.run(_scrape.scrape_bill_details_batch(34, ["HB 1", "HB  2"]))
+    assert sorted(found) == ["HB 1", "HB 2"]
+    assert sorted(asked) == ["HB 1", "HB 2"]
+
+
+def test_bulk_scrape_falls_back_if_a_page_isnt_json(monkeypatch):
+    not_json = ValueError("Invalid JSON: <html>Service Unavailable</html>")
+    asked = _fake_bill_details(monkeypatch, [not_json])
+    found = asyncio.run(_scrape.scrape_bill_details_batch(34, ["HB 1"]))
+    assert list(found) == asked == ["HB 1"]
+
+
+def test_bulk_scrape_doesnt_hide_bugs(monkeypatch):
+    _fake_bill_details(monkeypatch, [TypeError("a bug")])
+    with pytest.raises(TypeError):
+        asyncio.run(_scrape.scrape_bill_details_batch(34, ["HB 1"]))
+
+
+def test_map_unordered_raises_the_first_error():
+    async def f(n: int) -> int:
+        await asyncio.sleep(0.001 * n)
+        if n == 3:
+            raise ValueError(n)
+        return n
+
+    with pytest.raises(ValueError, match="3"):
+        asyncio.run(_collect(_scrape._map_unordered(f, [1, 2, 3, 4, 5], 2)))
+    results = asyncio.run(_collect(_scrape._map_unordered(f, [1, 2, 4], 2)))
+    assert sorted(results) == [(1, 1), (2, 2), (4, 4)]
+
+
+async def _collect(results):
+    return [r async for r in results]
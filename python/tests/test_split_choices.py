@@ -0,0 +1,70 @@
+import ibis
+import pytest
+
+from alaska_legislative_data import _parse, _split_choices
+
+BILLS = ibis.memtable(
+    {
+        "LegislatureNumber": [33, 34, 34],
+        "BillNumber": ["HB 1", "HB 1", "SB 7"],
+        "BillId": ["33:HB 1", "34:HB 1", "34:SB 7"],
+    }
+)
+MEMBERS = ibis.memtable(
+    {
+        "LegislatureNumber": [33, 34, 34, 34],
+        "MemberCode": ["AAA", "AAA", "BBB", None],
+        "MemberId": ["33:H:1:a", "34:H:1:a", "34:S:A:b", "34:H:2:old"],
+    }
+)
+
+
+def _raw(*rows: tuple) -> ibis.Table:
+    """Raw votes, like `_ingest._read_vote_spool` gives, from
+    (LegislatureNumber, VoteNum, Title, Bill, Member, Vote)s."""
+    columns = ["LegislatureNumber", "VoteNum", "Title", "Bill", "Member", "Vote"]
+    records = [{**dict(zip(columns, row)), "VoteDate": "2025-03-03"} for row in rows]
+    schema = {
+        "LegislatureNumber": "int16",
+        "VoteNum": "string",
+        "VoteDate": "string",
+        "Title": "string",
+        "Bill": "string",
+        "Member": "string",
+        "Vote": "string",
+    }
+    return _parse.clean_choices(ibis.memtable(records, schema=schema))
+
+
+def _split(raw: ibis.Table, materialize: bool) -> tuple[list[dict], list[dict]]:
+    votes, choices = _split_choices.split_choices(
+        choices_raw=raw, bills=BILLS, members=MEMBERS, materialize=materialize
+    )
+    return votes.to_pyarrow().to_pylist(), choices.to_pyarrow().to_pylist()
+
+
+def test_materialized_split_matches_lazy_split():
+    raw = _raw(
+        (33, "H0001", "HB 1 Third Reading", "HB   1", "AAA", "Y"),
+        (34, "H0001", "HB 1 Third Reading", "HB   1", "AAA", "N"),
+        (34, "S0002", "SB 7 Amendment No. 2", "SB   7", "BBB", "Y"),
+        (34, "S0002", "SB 7 Amendment No. 2", "SB   7", "BBB", "Y"),
+        (34, "S0003", "Confirmation", None, "BBB", "A"),
+    )
+    votes, choices = _split(raw, materialize=True)
+    assert (votes, choices) == _split(raw, materialize=False)
+    assert [v["VoteId"] for v in votes] == ["33:H:1", "34:H:1", "34:S:2", "34:S:3"]
+    assert [v["BillId"] for v in votes] == ["33:HB 1", "34:HB 1", "34:SB 7", None]
+    assert [c["ChoiceId"] for c in choices] == [
+        "33:H:1:H:1:a",
+        "34:H:1:H:1:a",
+        "34:S:2:S:A:b",
+        "34:S:3:S:A:b",
+    ]
+
+
+@pytest.mark.parametrize("materialize", [True, False])
+def test_unknown_members_are_rejected(materialize: bool):
+    raw = _raw((34, "H0001", "HB 1 Third Reading", "HB   1", "ZZZ", "Y"))
+    with pytest.raises(AssertionError):
+        _split(raw, materialize=materialize)
@@ -0,0 +1,65 @@
+import datetime
+
+import pytest
+
+from alaska_legislative_data import _unavailable
+
+REQUEST = {"session": 18, "chamber": None, "queries": ["members;code=ABC", "Votes"]}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "unavailable.json"
+
+
+def _later(monkeypatch, **kwargs) -> None:
+    """Move the registry's clock forward."""
+    now = _unavailable._now() + datetime.timedelta(**kwargs)
+    monkeypatch.setattr(_unavailable, "_now", lambda: now)
+
+
+def test_unimplemented_is_skipped_right_away(path):
+    registry = _unavailable.UnavailableRegistry(path)
+    assert registry.lookup("members", **REQUEST) is None
+    registry.record("members", **REQUEST, kind="unimplemented")
+    assert registry.lookup("members", **REQUEST) == "unimplemented"
+    # It's saved for the next run.
+    next_run = _unavailable.UnavailableRegistry(path)
+    assert next_run.lookup("members", **REQUEST) == "unimplemented"
+    assert next_run.lookup("members", **{**REQUEST, "session": 19}) is None
+
+
+def test_server_errors_count_once_per_run(path):
+    registry = _unavailable.UnavailableRegistry(path)
+    registry.record("members", **REQUEST, kind="server_error")
+    registry.record("members", **REQUEST, kind="server_error")
+    assert registry.lookup("members", **REQUEST) is None
+    next_run = _unavailable.UnavailableRegistry(path)
+    next_run.record("members", **REQUEST, kind="server_error")
+    assert next_run.lookup("members", **REQUEST) == "server_error"
+
+
+def test_entries_expire(path, monkeypatch):
+    registry = _unavailable.UnavailableRegistry(path)
+    registry.record("members", **REQUEST, kind="unimplemented")
+    _later(monkeypatch, days=31)
+    assert registry.lookup("members", **REQUEST) is None
+
+
+def test_old_server_errors_dont_add_up(path, monkeypatch):
+    _unavailable.UnavailableRegistry(path).record(
+        "members", **REQUEST, kind="server_error"
+    )
+    _later(monkeypatch, days=60)
+    next_run = _unavailable.UnavailableRegistry(path)
+    next_run.record("members", **REQUEST, kind="server_error")
+    # The first failure was too long ago, so this is the first of a new streak.
+    assert next_run.lookup("members", **REQUEST) is None
+
+
+def test_clear(path):
+    registry = _unavailable.UnavailableRegistry(path)
+    registry.record("members", **REQUEST, kind="unimplemented")
+    registry.clear("members", **REQUEST)
+    assert registry.lookup("members", **REQUEST) is None
+    assert _unavailable.UnavailableRegistry(path).lookup("members", **REQUEST) is None
@@ -0,0 +1,18 @@
+import pytest
+
+from alaska_legislative_data import _util
+
+
+@pytest.mark.parametrize(
+    "year,expected",
+    [
+        (2021, 32),
+        (2022, 32),
+        (2023, 33),
+        (2024, 33),
+        (2025, 34),
+        (2026, 34),
+    ],
+)
+def test_current_leg_num_approx(year: int, expected: int):
+    assert _util.current_leg_num_approx(year) == expected